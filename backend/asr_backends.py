@@ -0,0 +1,348 @@
+"""
+Pluggable streaming ASR backends.
+
+Both /ws endpoints talk to speech recognition through one interface, so any
+backend can be served, compared and profiled behind either endpoint:
+
+- ``ASRBackend``: loads the model (``start``), hands out one ``ASRStream``
+  per connection (``open``), and a fresh one at every utterance boundary
+  (``renew``)
+- ``ASRStream``: one utterance. ``feed`` audio, ``end`` it, and read
+  ``ASRUpdate`` s (newly confirmed text and the current partial hypothesis)
+  from ``results()``, which finishes after the final update following
+  ``end``. ``text()`` is the confirmed transcript so far.
+
+Backends are chosen by name with ``ASR_ENGINE``:
+
+- ``whisperlivekit``: WhisperLiveKit AudioProcessors (``WHISPER_BACKEND``
+  selects its model backend; ``ASR_WORKERS`` runs them in worker processes)
+- ``stub``: deterministic CPU stand-in with configurable real-time factor and
+  latency (see stub_asr), for profiling without model weights
+- ``simulwhisper`` / ``fallback``: per-connection SimulWhisper or windowed
+  openai-whisper sessions
+- ``auto``: SimulWhisper on Apple Silicon, otherwise the fallback
+  (``FORCE_FALLBACK``)
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Hashable, Optional, Protocol
+
+from transcript import IncrementalTranscript
+
+logger = logging.getLogger(__name__)
+
+
+class BackendBusy(RuntimeError):
+    """Raised by ``open`` when the backend cannot take another connection."""
+
+
+@dataclass
+class ASRUpdate:
+    # Newly confirmed text deltas, in order
+    committed: list[str] = field(default_factory=list)
+    # Current unconfirmed hypothesis, if there is one to show
+    partial: str = ""
+    # Emitted by ``end``: the committed text is final even if not streaming
+    final: bool = False
+
+
+class ASRStream(Protocol):
+    # Whether committed text is final (partials come separately) or is itself
+    # a revisable hypothesis
+    streaming: bool
+    # Metrics label of the model behind this stream
+    backend: str
+
+    async def feed(self, audio: bytes): ...
+
+    async def end(self): ...
+
+    def results(self) -> AsyncIterator[ASRUpdate]: ...
+
+    def text(self) -> str: ...
+
+    def restore(self, text: str): ...
+
+
+class ASRBackend(Protocol):
+    name: str
+
+    async def start(self): ...
+
+    async def open(self, session_key: Hashable) -> ASRStream: ...
+
+    async def renew(self, stream: ASRStream) -> ASRStream: ...
+
+    def release(self, stream: ASRStream): ...
+
+    async def close(self): ...
+
+
+# --- WhisperLiveKit-style AudioProcessors (whisperlivekit, stub) -------------
+
+
+class _ProcessorStream:
+    """An AudioProcessor and its FrontData results as an ``ASRStream``.
+
+    ``feed`` only queues audio; inference runs inside the processor, which
+    exposes no per-chunk timings, so no ASR_RTF is recorded for this stream.
+    Its confirmation lag (CONFIRM_LAG_SECONDS) is measured by the handler.
+    """
+
+    streaming = True
+
+    def __init__(self, backend: str, session_key, processor, results_generator):
+        self.backend = backend
+        self.session_key = session_key
+        self.processor = processor
+        self._results_generator = results_generator
+        self._transcript = IncrementalTranscript()
+
+    async def feed(self, audio: bytes):
+        await self.processor.process_audio(audio)
+
+    async def end(self):
+        # Empty audio signals end-of-stream to the processor
+        await self.processor.process_audio(None)
+
+    async def results(self) -> AsyncIterator[ASRUpdate]:
+        async for front_data in self._results_generator:
+            update = ASRUpdate()
+            if front_data.lines:
+                update.committed = self._transcript.update(front_data.lines)
+            if front_data.buffer_transcription:
+                update.partial = front_data.buffer_transcription
+            if update.committed or update.partial:
+                yield update
+
+    def text(self) -> str:
+        return self._transcript.text()
+
+    def restore(self, text: str):
+        # Text only: an AudioProcessor takes no per-stream decoding prompt
+        # (WhisperLiveKit's init_prompt is engine-wide), so the ASR resumes
+        # without the restored words as context
+        self._transcript.restore(text)
+
+
+class ProcessorPoolBackend:
+    """Warm AudioProcessors from an in-process or multi-process pool."""
+
+    def __init__(
+        self,
+        build_engine: Callable[[], object],
+        name: str,
+        workers: Optional[int] = None,
+    ):
+        if workers is None:
+            workers = int(os.getenv("ASR_WORKERS", "0"))
+        self._build_engine = build_engine
+        self.name = name
+        self.workers = workers
+        self.engine = None
+        self.pool = None
+        self._start_lock = asyncio.Lock()
+
+    async def start(self):
+        """Load the engine off the event loop and warm the processor pool."""
+        async with self._start_lock:
+            if self.pool is not None:
+                return
+            self.engine = await asyncio.to_thread(self._build_engine)
+            if self.workers > 0:
+                from asr_workers import RemoteProcessorPool
+
+                pool = RemoteProcessorPool(self.engine, self.workers)
+                await pool.start()
+            else:
+                from processor_pool import AudioProcessorPool
+
+                pool = AudioProcessorPool(self.engine)
+                pool.warm_up()
+            self.pool = pool
+
+    async def open(self, session_key) -> _ProcessorStream:
+        # With ASR workers, all of a connection's processors come from one worker
+        processor, results_generator = await self.pool.acquire(session_key)
+        return _ProcessorStream(self.name, session_key, processor, results_generator)
+
+    async def renew(self, stream: _ProcessorStream) -> _ProcessorStream:
+        """Hand back the used processor and continue on a warm one."""
+        self.pool.release(stream.processor)
+        return await self.open(stream.session_key)
+
+    def release(self, stream: _ProcessorStream):
+        self.pool.release(stream.processor)
+        self.pool.forget(stream.session_key)
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+
+
+# --- per-connection sessions (simulwhisper, fallback) ------------------------
+
+
+class _SessionStream:
+    """A feed/finish transcription session as an ``ASRStream``."""
+
+    def __init__(self, session):
+        self.session = session
+        self.backend = type(session).__name__
+        self.streaming = getattr(session, "streaming", False)
+        self._updates: asyncio.Queue = asyncio.Queue()
+        self._committed: list[str] = []
+        self._prefix = ""
+        self._last_partial = ""
+
+    def _emit(self, text: Optional[str], final: bool = False):
+        update = ASRUpdate(final=final)
+        if text:
+            self._committed.append(text)
+            update.committed = [text]
+        # Streaming fallback: also report the not-yet-confirmed hypothesis
+        if self.streaming and self.session.partial != self._last_partial:
+            self._last_partial = self.session.partial
+            update.partial = self._last_partial
+        if update.committed or update.partial:
+            self._updates.put_nowait(update)
+
+    async def feed(self, audio: bytes):
+        self._emit(await self.session.feed_audio_async(audio))
+
+    async def end(self):
+        self._emit(await self.session.finish_async(), final=True)
+        self._updates.put_nowait(None)
+
+    async def results(self) -> AsyncIterator[ASRUpdate]:
+        while True:
+            update = await self._updates.get()
+            if update is None:
+                return
+            yield update
+
+    def text(self) -> str:
+        return " ".join(filter(None, [self._prefix, *self._committed]))
+
+    def restore(self, text: str):
+        self._prefix = text
+        # Keep the ASR context (prompt words) where the session supports it
+        if hasattr(self.session, "restore_context"):
+            self.session.restore_context(text)
+
+
+class SessionPoolBackend:
+    """Per-connection sessions from a ``TranscriptionSessionPool``."""
+
+    def __init__(self, kind: Optional[str] = None):
+        self.kind = kind
+        self.pool = None
+
+    @property
+    def name(self) -> str:
+        prototype = self.pool and self.pool._prototype
+        return type(prototype).__name__ if prototype else self.kind or "auto"
+
+    @property
+    def governor(self):
+        return self.pool.governor if self.pool else None
+
+    async def start(self):
+        import simul_whisper_service
+
+        if self.pool is None and self.kind is None:
+            # The shared pool, also used by anything else in the process
+            self.pool = simul_whisper_service.session_pool
+        elif self.pool is None:
+            self.pool = simul_whisper_service.TranscriptionSessionPool(kind=self.kind)
+        await self.pool.warm_up()
+
+    async def open(self, session_key) -> _SessionStream:
+        from simul_whisper_service import SessionLimitExceeded
+
+        try:
+            session = await self.pool.acquire()
+        except SessionLimitExceeded as e:
+            raise BackendBusy(str(e)) from e
+        return _SessionStream(session)
+
+    async def renew(self, stream: _SessionStream) -> _SessionStream:
+        stream.session.reset()
+        return _SessionStream(stream.session)
+
+    def release(self, stream: _SessionStream):
+        self.pool.release(stream.session)
+
+    async def close(self):
+        if self.pool is not None:
+            await self.pool.close()
+
+
+# --- registry ----------------------------------------------------------------
+
+_REGISTRY: dict[str, Callable[[], ASRBackend]] = {}
+
+
+def register_backend(name: str):
+    """Register a zero-argument factory under ``name``."""
+
+    def decorator(factory: Callable[[], ASRBackend]):
+        _REGISTRY[name] = factory
+        return factory
+
+    return decorator
+
+
+@register_backend("whisperlivekit")
+def _whisperlivekit() -> ASRBackend:
+    backend = os.getenv("WHISPER_BACKEND", "mlx-whisper")
+
+    def build_engine():
+        from whisperlivekit import TranscriptionEngine
+
+        return TranscriptionEngine(
+            model_size=os.getenv("WHISPER_MODEL", "large-v3-turbo"),
+            lan=os.getenv("WHISPER_LANGUAGE", "ko"),
+            backend=backend,
+            pcm_input=True,  # Direct 16kHz INT16 PCM input
+        )
+
+    return ProcessorPoolBackend(build_engine, name=backend)
+
+
+@register_backend("stub")
+def _stub() -> ASRBackend:
+    from stub_asr import StubTranscriptionEngine
+
+    return ProcessorPoolBackend(StubTranscriptionEngine, name="stub")
+
+
+@register_backend("simulwhisper")
+def _simulwhisper() -> ASRBackend:
+    return SessionPoolBackend(kind="simulwhisper")
+
+
+@register_backend("fallback")
+def _fallback() -> ASRBackend:
+    return SessionPoolBackend(kind="fallback")
+
+
+@register_backend("auto")
+def _auto() -> ASRBackend:
+    return SessionPoolBackend()
+
+
+def create_asr_backend(name: Optional[str] = None, default: str = "auto") -> ASRBackend:
+    """Backend registered as ``name`` (``ASR_ENGINE``, else ``default``)."""
+    if name is None:
+        name = os.getenv("ASR_ENGINE") or default
+    factory = _REGISTRY.get(name)
+    if factory is None:
+        raise ValueError(
+            f"Unknown ASR_ENGINE {name!r}; available: {', '.join(sorted(_REGISTRY))}"
+        )
+    logger.info(f"ASR backend: {name}")
+    return factory()
@@ -0,0 +1,208 @@
+"""
+Load-aware ASR quality/latency governor.
+
+Watches the real-time factor reported by every transcription session and how
+far each session's processing trails its incoming audio, smoothed with an
+EWMA. When the service falls behind it steps down a tier (larger fallback
+windows and SimulWhisper chunks, greedy decoding, finally a smaller model);
+when there is headroom again it steps back up.
+
+Flapping is avoided with separate up/down thresholds and a minimum dwell time
+between changes. Every change is logged and exported as a metric. Sessions
+pick up the current tier at utterance boundaries (``reset``), so a running
+utterance is never re-configured halfway through.
+
+Enable with ``ASR_GOVERNOR=true``.
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from metrics import ASR_TIER
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class QualityTier:
+    name: str
+    # Model size; None keeps the configured WHISPER_MODEL
+    model: Optional[str]
+    # WhisperFallbackService window (seconds)
+    fallback_window: float
+    # SimulWhisper decoding parameters
+    frame_threshold: int
+    min_chunk_size: float
+    beams: int
+
+
+def default_tiers() -> tuple[QualityTier, ...]:
+    """Full quality first; each following tier does less work per second."""
+    return (
+        QualityTier(
+            "full",
+            model=None,
+            fallback_window=2.5,
+            frame_threshold=25,
+            min_chunk_size=0.5,
+            beams=int(os.getenv("WHISPER_BEAMS", "1")),
+        ),
+        QualityTier(
+            "relaxed",
+            model=None,
+            fallback_window=4.0,
+            frame_threshold=30,
+            min_chunk_size=1.0,
+            beams=1,
+        ),
+        QualityTier(
+            "light",
+            model=os.getenv("ASR_GOVERNOR_LIGHT_MODEL", "base"),
+            fallback_window=5.0,
+            frame_threshold=30,
+            min_chunk_size=1.0,
+            beams=1,
+        ),
+    )
+
+
+class ASRGovernor:
+    """Chooses the quality tier from smoothed RTF and lag across sessions."""
+
+    def __init__(
+        self,
+        tiers: Optional[tuple[QualityTier, ...]] = None,
+        rtf_high: Optional[float] = None,
+        rtf_low: Optional[float] = None,
+        lag_high: Optional[float] = None,
+        lag_low: Optional[float] = None,
+        dwell_seconds: Optional[float] = None,
+        alpha: float = 0.2,
+    ):
+        if rtf_high is None:
+            rtf_high = float(os.getenv("ASR_GOVERNOR_RTF_HIGH", "0.8"))
+        if rtf_low is None:
+            rtf_low = float(os.getenv("ASR_GOVERNOR_RTF_LOW", "0.4"))
+        if lag_high is None:
+            lag_high = float(os.getenv("ASR_GOVERNOR_LAG_HIGH", "1.5"))
+        if lag_low is None:
+            lag_low = float(os.getenv("ASR_GOVERNOR_LAG_LOW", "0.3"))
+        if dwell_seconds is None:
+            dwell_seconds = float(os.getenv("ASR_GOVERNOR_DWELL", "10"))
+
+        self.tiers = tiers or default_tiers()
+        self.rtf_high = rtf_high
+        self.rtf_low = rtf_low
+        self.lag_high = lag_high
+        self.lag_low = lag_low
+        self.dwell = dwell_seconds
+        self.alpha = alpha
+
+        self.index = 0
+        self.rtf: Optional[float] = None
+        self.lag: Optional[float] = None
+        self._changed_at = time.monotonic()
+        # Observations arrive from ASR worker threads
+        self._lock = threading.Lock()
+        # Loaded WhisperService per model size, shared by fallback sessions
+        self._services: dict[str, object] = {}
+        ASR_TIER.set(0)
+
+    @property
+    def tier(self) -> QualityTier:
+        return self.tiers[self.index]
+
+    def _smooth(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return current + self.alpha * (value - current)
+
+    def observe_rtf(self, rtf: float):
+        with self._lock:
+            self.rtf = self._smooth(self.rtf, rtf)
+            self._evaluate()
+
+    def observe_lag(self, seconds: float):
+        with self._lock:
+            self.lag = self._smooth(self.lag, seconds)
+            self._evaluate()
+
+    def _evaluate(self):
+        now = time.monotonic()
+        if now - self._changed_at < self.dwell:
+            return
+        rtf = self.rtf or 0.0
+        lag = self.lag or 0.0
+
+        if rtf > self.rtf_high or lag > self.lag_high:
+            target = min(self.index + 1, len(self.tiers) - 1)
+        elif rtf < self.rtf_low and lag < self.lag_low:
+            target = max(self.index - 1, 0)
+        else:
+            return
+        if target == self.index:
+            return
+
+        logger.info(
+            f"ASR governor: {self.tier.name} -> {self.tiers[target].name} "
+            f"(rtf={rtf:.2f}, lag={lag:.2f}s)"
+        )
+        self.index = target
+        self._changed_at = now
+        ASR_TIER.set(target)
+        if self.tier.model and self.tier.model not in self._services:
+            self._preload(self.tier.model)
+
+    def apply(self, session):
+        """Hand the current tier to a session at an utterance boundary."""
+        session.apply_tier(self.tier)
+
+    def register_service(self, service):
+        """Register the startup fallback WhisperService under its model size."""
+        self._services.setdefault(service.model_size, service)
+
+    def _preload(self, model: str):
+        """Load a fallback model in the background; used once it is ready."""
+        if not self._services:
+            # No fallback sessions: SimulWhisper sessions load their own
+            return
+        from whisper_service import WhisperService
+
+        service = WhisperService(model_size=model)
+
+        def load():
+            try:
+                service.load()
+            except Exception as e:
+                logger.error(f"ASR governor: failed to load model {model}: {e}")
+                return
+            with self._lock:
+                self._services[model] = service
+            logger.info(f"ASR governor: model {model} ready")
+
+        threading.Thread(target=load, name="asr-governor-load", daemon=True).start()
+
+    def fallback_service(self, default):
+        """The WhisperService for the current tier, or ``default`` if not loaded."""
+        model = self.tier.model
+        if model is None:
+            return default
+        service = self._services.get(model)
+        return service if service is not None and service.loaded else default
+
+
+def create_governor() -> Optional[ASRGovernor]:
+    """Create the governor when ASR_GOVERNOR is enabled."""
+    if os.getenv("ASR_GOVERNOR", "false").lower() != "true":
+        return None
+    governor = ASRGovernor()
+    logger.info(
+        f"ASR governor enabled: tiers={[tier.name for tier in governor.tiers]}, "
+        f"rtf {governor.rtf_low}-{governor.rtf_high}, "
+        f"lag {governor.lag_low}-{governor.lag_high}s, dwell {governor.dwell}s"
+    )
+    return governor
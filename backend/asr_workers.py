@@ -0,0 +1,373 @@
+"""
+Multi-process ASR mode for the WhisperLiveKit /ws endpoint (Linux).
+
+The front process keeps owning every WebSocket; transcription runs in a pool
+of ASR worker processes so it scales with cores instead of one interpreter.
+
+- The TranscriptionEngine is loaded once in the front process and the
+  workers are forked from it, so model weights are shared copy-on-write.
+- Each connection sticks to one worker for its whole lifetime.
+- Audio travels through one shared-memory ring per worker; a socketpair
+  only carries small control messages (offsets, results).
+- ``RemoteProcessorPool`` mirrors ``AudioProcessorPool`` and the processors
+  it hands out mirror ``AudioProcessor`` (``process_audio``, ``cleanup`` and
+  a FrontData-like results generator), so the endpoint code is unchanged.
+
+Enable with ``ASR_WORKERS=<n>``. Forking needs the ``fork`` start method,
+which is why this mode is Linux-only (MLX/Metal is not fork-safe on macOS).
+
+Caveat: the workers are forked from a process that is already
+multi-threaded. Loading the engine starts torch/OpenMP thread pools, and
+asyncio has its default executor. A child only gets the forking thread, so
+a lock held by any other thread at fork time stays locked in the child
+forever. Forking earlier is not an option, because the weights have to be
+loaded first to be shared. A worker that dies or stops draining its ring
+is therefore treated as gone: new sessions avoid it, and audio for it
+fails with ``BackendBusy`` after ``ASR_WORKER_STALL_TIMEOUT`` seconds
+instead of waiting forever.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import socket
+import struct
+import time
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+from typing import Optional
+
+from asr_backends import BackendBusy
+
+logger = logging.getLogger(__name__)
+
+SHM_BYTES = int(float(os.getenv("ASR_WORKER_SHM_MB", "8")) * 1024 * 1024)
+# Longest wait for a worker to free ring space before giving up on it
+STALL_TIMEOUT = float(os.getenv("ASR_WORKER_STALL_TIMEOUT", "10.0"))
+
+_CLOSE = object()
+
+# Control messages are length-prefixed pickles over a socketpair; asyncio
+# streams keep both event loops from blocking on a full socket buffer
+_LENGTH = struct.Struct("<I")
+
+
+def _write_message(writer: asyncio.StreamWriter, message: tuple):
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    writer.write(_LENGTH.pack(len(payload)) + payload)
+
+
+async def _read_message(reader: asyncio.StreamReader) -> tuple:
+    header = await reader.readexactly(_LENGTH.size)
+    (length,) = _LENGTH.unpack(header)
+    return pickle.loads(await reader.readexactly(length))
+
+
+def _front_data_to_dict(front_data) -> dict:
+    return {
+        "lines": [
+            {
+                "text": line.text,
+                "start": getattr(line, "start", None),
+                "end": getattr(line, "end", None),
+            }
+            for line in (front_data.lines or [])
+        ],
+        "buffer_transcription": front_data.buffer_transcription,
+    }
+
+
+def _dict_to_front_data(data: dict) -> SimpleNamespace:
+    return SimpleNamespace(
+        lines=[SimpleNamespace(**line) for line in data["lines"]],
+        buffer_transcription=data["buffer_transcription"],
+    )
+
+
+# --- worker process ---------------------------------------------------------
+
+
+class _Worker:
+    """Event loop of one ASR worker process."""
+
+    def __init__(self, engine, sock, shm, consumed):
+        self.engine = engine
+        self.sock = sock
+        self.shm = shm
+        self.consumed = consumed
+        self.inboxes: dict[int, asyncio.Queue] = {}
+
+    def _read(self, pos: int, length: int) -> bytes:
+        size = self.shm.size
+        first = min(length, size - pos)
+        data = bytes(self.shm.buf[pos : pos + first])
+        if first < length:
+            data += bytes(self.shm.buf[: length - first])
+        # Copy out in arrival order, then free the ring space for the front
+        self.consumed.value += length
+        return data
+
+    def _handle(self, message: tuple):
+        kind, pid = message[0], message[1]
+        if kind == "open":
+            inbox = asyncio.Queue()
+            self.inboxes[pid] = inbox
+            asyncio.create_task(self._serve(pid, inbox))
+        elif kind == "audio":
+            self.inboxes[pid].put_nowait(self._read(message[2], message[3]))
+        elif kind == "end":
+            self.inboxes[pid].put_nowait(None)
+        elif kind == "close":
+            self.inboxes[pid].put_nowait(_CLOSE)
+
+    async def _forward(self, pid: int, results_generator):
+        async for front_data in results_generator:
+            _write_message(
+                self.writer, ("result", pid, _front_data_to_dict(front_data))
+            )
+        _write_message(self.writer, ("done", pid))
+
+    async def _serve(self, pid: int, inbox: asyncio.Queue):
+        processor, results_generator = await self.pool.acquire()
+        forward = asyncio.create_task(self._forward(pid, results_generator))
+        try:
+            while True:
+                item = await inbox.get()
+                if item is _CLOSE:
+                    break
+                await processor.process_audio(item)
+        finally:
+            forward.cancel()
+            try:
+                await forward
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.pool.release(processor)
+            self.inboxes.pop(pid, None)
+
+    async def run(self):
+        from processor_pool import AudioProcessorPool
+
+        self.pool = AudioProcessorPool(self.engine)
+        self.pool.warm_up()
+        reader, self.writer = await asyncio.open_connection(sock=self.sock)
+        try:
+            while True:
+                message = await _read_message(reader)
+                if message[0] == "stop":
+                    break
+                self._handle(message)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            # Front process went away
+            pass
+        await self.pool.close()
+        self.writer.close()
+
+
+def _worker_main(engine, sock, shm, consumed):
+    asyncio.run(_Worker(engine, sock, shm, consumed).run())
+
+
+# --- front process ----------------------------------------------------------
+
+
+class RemoteAudioProcessor:
+    """Front-side stand-in for an AudioProcessor running in a worker."""
+
+    def __init__(self, worker: "_WorkerHandle", pid: int):
+        self._worker = worker
+        self.pid = pid
+        self._results: asyncio.Queue = asyncio.Queue()
+
+    async def results(self):
+        while True:
+            data = await self._results.get()
+            if data is None:
+                return
+            yield _dict_to_front_data(data)
+
+    async def process_audio(self, audio: Optional[bytes]):
+        # Like AudioProcessor, empty audio signals end-of-stream
+        if not audio:
+            self._worker.send(("end", self.pid))
+            return
+        await self._worker.write_audio(self.pid, audio)
+
+    async def cleanup(self):
+        self._worker.processors.pop(self.pid, None)
+        self._worker.send(("close", self.pid))
+
+
+class _WorkerHandle:
+    """Front-side handle of one worker: process, pipe and shared-memory ring."""
+
+    def __init__(self, ctx, engine, index: int):
+        self.index = index
+        self.shm = shared_memory.SharedMemory(create=True, size=SHM_BYTES)
+        self.consumed = ctx.Value("Q", 0, lock=False)
+        self.written = 0
+        self.sessions = 0
+        self.processors: dict[int, RemoteAudioProcessor] = {}
+
+        self.sock, child_sock = socket.socketpair()
+        # fork: engine, ring and counter are inherited, not pickled
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(engine, child_sock, self.shm, self.consumed),
+            name=f"asr-worker-{index}",
+            daemon=True,
+        )
+        self.process.start()
+        child_sock.close()
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    async def connect(self):
+        reader, self.writer = await asyncio.open_connection(sock=self.sock)
+        self._reader_task = asyncio.create_task(self._read_results(reader))
+
+    @property
+    def alive(self) -> bool:
+        """Process running and its result stream still open."""
+        return (
+            not self._closing
+            and self.process.is_alive()
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+
+    def send(self, message: tuple):
+        if self.writer.is_closing():
+            logger.error(f"ASR worker {self.index} unreachable")
+            return
+        _write_message(self.writer, message)
+
+    async def write_audio(self, pid: int, audio: bytes):
+        length = len(audio)
+        size = self.shm.size
+        if length > size:
+            raise ValueError(f"Audio frame larger than worker ring ({size} bytes)")
+        # Backpressure: wait until the worker has copied out enough audio
+        deadline = time.monotonic() + STALL_TIMEOUT
+        while self.written + length - self.consumed.value > size:
+            if not self.alive:
+                raise BackendBusy(f"ASR worker {self.index} exited")
+            if time.monotonic() > deadline:
+                raise BackendBusy(
+                    f"ASR worker {self.index} stalled for {STALL_TIMEOUT:.0f}s"
+                )
+            await asyncio.sleep(0.005)
+        if not self.alive:
+            raise BackendBusy(f"ASR worker {self.index} exited")
+
+        pos = self.written % size
+        first = min(length, size - pos)
+        self.shm.buf[pos : pos + first] = audio[:first]
+        if first < length:
+            self.shm.buf[: length - first] = audio[first:]
+        self.written += length
+        self.send(("audio", pid, pos, length))
+
+    async def _read_results(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                kind, pid, *rest = await _read_message(reader)
+                processor = self.processors.get(pid)
+                if processor is None:
+                    continue
+                if kind == "result":
+                    processor._results.put_nowait(rest[0])
+                elif kind == "done":
+                    processor._results.put_nowait(None)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            if not self._closing:
+                logger.error(f"ASR worker {self.index} exited")
+        finally:
+            # End every open results stream so no connection hangs on it
+            for processor in self.processors.values():
+                processor._results.put_nowait(None)
+            self.processors.clear()
+
+    async def close(self):
+        self._closing = True
+        self.send(("stop",))
+        await self.writer.drain()
+        await asyncio.to_thread(self.process.join, 5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+        self.writer.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class RemoteProcessorPool:
+    """AudioProcessorPool counterpart that runs processors in worker processes."""
+
+    def __init__(self, transcription_engine, workers: int):
+        self.transcription_engine = transcription_engine
+        self.worker_count = workers
+        self._workers: list[_WorkerHandle] = []
+        self._assignments: dict = {}
+        self._pids = itertools.count()
+
+    def _spawn(self):
+        ctx = multiprocessing.get_context("fork")
+        return [
+            _WorkerHandle(ctx, self.transcription_engine, i)
+            for i in range(self.worker_count)
+        ]
+
+    async def start(self):
+        # Fork from a worker thread with no running event loop, so the child
+        # starts with a clean asyncio state
+        self._workers = await asyncio.to_thread(self._spawn)
+        for worker in self._workers:
+            await worker.connect()
+        logger.info(f"Started {len(self._workers)} ASR worker processes")
+
+    def _worker_for(self, session_key) -> _WorkerHandle:
+        worker = self._assignments.get(session_key)
+        if worker is not None and not worker.alive:
+            # Move the session off a dead worker
+            self.forget(session_key)
+            worker = None
+        if worker is None:
+            alive = [w for w in self._workers if w.alive]
+            if not alive:
+                raise BackendBusy("No ASR worker process is running")
+            worker = min(alive, key=lambda w: w.sessions)
+            worker.sessions += 1
+            if session_key is not None:
+                self._assignments[session_key] = worker
+        return worker
+
+    async def acquire(self, session_key=None):
+        """Open a processor on the worker this session sticks to."""
+        worker = self._worker_for(session_key)
+        pid = next(self._pids)
+        processor = RemoteAudioProcessor(worker, pid)
+        worker.processors[pid] = processor
+        worker.send(("open", pid))
+        return processor, processor.results()
+
+    def release(self, processor: RemoteAudioProcessor):
+        asyncio.create_task(processor.cleanup())
+
+    def forget(self, session_key):
+        """Drop the sticky assignment once the connection is closed."""
+        worker = self._assignments.pop(session_key, None)
+        if worker is not None:
+            worker.sessions -= 1
+
+    async def close(self):
+        await asyncio.gather(*(worker.close() for worker in self._workers))
+        self._workers = []
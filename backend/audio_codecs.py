@@ -0,0 +1,172 @@
+"""
+Compact audio ingestion for the /ws endpoints.
+
+By default clients stream raw 16kHz int16 PCM. A client can instead send
+``{"type": "config", "codec": ..., "sample_rate": ..., "framed": ...}``
+first to negotiate a compressed format:
+
+- ``pcm16``: raw int16 PCM (useful together with framing)
+- ``mulaw`` / ``alaw``: G.711 8-bit, decoded with NumPy lookup tables
+- ``opus``: requires the optional ``opuslib`` package
+
+With ``framed`` (the default for a negotiated codec), every binary message
+starts with an 8-byte little-endian header: uint32 sequence number and
+uint32 capture timestamp in milliseconds. Gaps in the sequence are counted
+as dropped frames. Decoding runs in a shared thread pool and yields the
+16kHz int16 PCM that the rest of the pipeline expects.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+try:
+    import opuslib
+except ImportError:
+    opuslib = None
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_HEADER = struct.Struct("<II")  # sequence number, timestamp (ms)
+SUPPORTED_CODECS = ("pcm16", "mulaw", "alaw", "opus")
+SUPPORTED_RATES = (8000, 16000)
+
+# Opus frames are at most 120 ms
+_OPUS_MAX_FRAME = SAMPLE_RATE * 120 // 1000
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AUDIO_DECODE_WORKERS", "4")),
+    thread_name_prefix="audio-decode",
+)
+
+
+def _mulaw_table() -> np.ndarray:
+    code = ~np.arange(256, dtype=np.int32) & 0xFF
+    sign = code & 0x80
+    exponent = (code >> 4) & 0x07
+    mantissa = code & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(sign, -magnitude, magnitude).astype(np.int16)
+
+
+def _alaw_table() -> np.ndarray:
+    code = np.arange(256, dtype=np.int32) ^ 0x55
+    sign = code & 0x80
+    exponent = (code >> 4) & 0x07
+    mantissa = code & 0x0F
+    magnitude = np.where(
+        exponent == 0,
+        (mantissa << 4) + 8,
+        ((mantissa << 4) + 0x108) << np.maximum(exponent - 1, 0),
+    )
+    return np.where(sign, magnitude, -magnitude).astype(np.int16)
+
+
+_MULAW = _mulaw_table()
+_ALAW = _alaw_table()
+
+
+def _upsample(samples: np.ndarray, rate: int) -> np.ndarray:
+    """Linear interpolation to 16kHz."""
+    if rate == SAMPLE_RATE or len(samples) == 0:
+        return samples
+    n_out = len(samples) * SAMPLE_RATE // rate
+    positions = np.arange(n_out, dtype=np.float32) * (rate / SAMPLE_RATE)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+
+class IngestDecoder:
+    """Per-connection decoder for a negotiated ingestion format."""
+
+    def __init__(
+        self, codec: str, sample_rate: int = SAMPLE_RATE, framed: bool = True
+    ):
+        if codec not in SUPPORTED_CODECS:
+            raise ValueError(f"Unsupported codec: {codec}")
+        if sample_rate not in SUPPORTED_RATES:
+            raise ValueError(f"Unsupported sample rate: {sample_rate}")
+        if codec == "opus" and opuslib is None:
+            raise ValueError("Opus decoding requires the opuslib package")
+
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.framed = framed
+        # Opus decoders are stateful; this connection decodes sequentially
+        self._opus = opuslib.Decoder(sample_rate, 1) if codec == "opus" else None
+
+        self.frames = 0
+        self.frames_dropped = 0
+        self.frames_out_of_order = 0
+        self.last_timestamp_ms: Optional[int] = None
+        self._next_seq: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, message: dict) -> Optional["IngestDecoder"]:
+        """Build a decoder from a ``config`` message (None for plain PCM)."""
+        codec = message.get("codec", "pcm16")
+        sample_rate = int(message.get("sample_rate", SAMPLE_RATE))
+        framed = bool(message.get("framed", True))
+        if codec == "pcm16" and sample_rate == SAMPLE_RATE and not framed:
+            return None
+        return cls(codec, sample_rate, framed)
+
+    def stats(self) -> dict:
+        return {
+            "codec": self.codec,
+            "frames": self.frames,
+            "frames_dropped": self.frames_dropped,
+            "frames_out_of_order": self.frames_out_of_order,
+        }
+
+    def _track_sequence(self, seq: int, timestamp_ms: int) -> bool:
+        """Update sequence tracking; False for a late (out-of-order) frame."""
+        if self._next_seq is not None and seq != self._next_seq:
+            gap = (seq - self._next_seq) & 0xFFFFFFFF
+            if gap < 0x80000000:
+                self.frames_dropped += gap
+                logger.warning(
+                    f"Audio frames dropped: expected {self._next_seq}, got {seq}"
+                )
+            else:
+                self.frames_out_of_order += 1
+                return False
+        self._next_seq = (seq + 1) & 0xFFFFFFFF
+        self.last_timestamp_ms = timestamp_ms
+        return True
+
+    def decode(self, frame: bytes) -> bytes:
+        """Decode one binary message to 16kHz int16 PCM bytes."""
+        self.frames += 1
+        payload = frame
+        if self.framed:
+            if len(frame) < FRAME_HEADER.size:
+                raise ValueError("Audio frame shorter than header")
+            seq, timestamp_ms = FRAME_HEADER.unpack_from(frame)
+            if not self._track_sequence(seq, timestamp_ms):
+                # Audio that arrives after its successors is dropped
+                return b""
+            payload = memoryview(frame)[FRAME_HEADER.size :]
+
+        if self.codec == "pcm16":
+            samples = np.frombuffer(payload, dtype=np.int16)
+        elif self.codec == "mulaw":
+            samples = _MULAW[np.frombuffer(payload, dtype=np.uint8)]
+        elif self.codec == "alaw":
+            samples = _ALAW[np.frombuffer(payload, dtype=np.uint8)]
+        else:
+            max_frame = _OPUS_MAX_FRAME * self.sample_rate // SAMPLE_RATE
+            pcm = self._opus.decode(bytes(payload), max_frame)
+            samples = np.frombuffer(pcm, dtype=np.int16)
+
+        return _upsample(samples, self.sample_rate).tobytes()
+
+    async def decode_async(self, frame: bytes) -> bytes:
+        """Decode in the shared audio-decode thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, self.decode, frame)
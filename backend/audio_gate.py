@@ -0,0 +1,150 @@
+"""
+Server-side energy voice-activity gate for 16kHz mono int16 PCM.
+
+Drops silent spans before audio reaches the ASR engines. A short pre-roll
+before speech onset and a hangover after speech are kept, so long silences
+are compressed to at most ``preroll_ms + hangover_ms`` instead of being
+transcribed in full.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+
+from metrics import VAD_FRAMES, VAD_INPUT_SECONDS, VAD_SKIPPED_SECONDS
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+_FULL_SCALE_POWER = 32768.0**2
+
+
+class EnergyVADGate:
+    """Vectorized frame-energy gate with pre-roll and hangover."""
+
+    def __init__(
+        self,
+        threshold_db: Optional[float] = None,
+        frame_ms: int = 30,
+        hangover_ms: Optional[int] = None,
+        preroll_ms: Optional[int] = None,
+    ):
+        if threshold_db is None:
+            threshold_db = float(os.getenv("VAD_THRESHOLD_DB", "-45"))
+        if hangover_ms is None:
+            hangover_ms = int(os.getenv("VAD_HANGOVER_MS", "300"))
+        if preroll_ms is None:
+            preroll_ms = int(os.getenv("VAD_PREROLL_MS", "150"))
+
+        self.threshold_db = threshold_db
+        self.frame_len = SAMPLE_RATE * frame_ms // 1000
+        self.hangover_frames = max(0, hangover_ms // frame_ms)
+        self.preroll_frames = max(0, preroll_ms // frame_ms)
+
+        # Counters
+        self.samples_in = 0
+        self.samples_skipped = 0
+        self.frames_total = 0
+        self.frames_speech = 0
+        self._skipped_exported = 0
+
+        self.reset()
+
+    def reset(self):
+        """Clear streaming state (counters are kept)."""
+        self._remainder = np.empty(0, dtype=np.int16)
+        # Frames since the last speech frame, carried across calls for hangover
+        self._since_speech = self.hangover_frames + 1
+        # Most recent dropped frames, replayed as pre-roll on speech onset
+        self._dropped_tail = np.empty((0, self.frame_len), dtype=np.int16)
+
+    @property
+    def speech_ratio(self) -> float:
+        if not self.frames_total:
+            return 0.0
+        return self.frames_speech / self.frames_total
+
+    def stats(self) -> dict:
+        return {
+            "samples_in": self.samples_in,
+            "samples_skipped": self.samples_skipped,
+            "speech_ratio": round(self.speech_ratio, 3),
+        }
+
+    def process(self, pcm: bytes) -> bytes:
+        """Return the audio to forward to the ASR (may be empty)."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        self.samples_in += len(samples)
+        VAD_INPUT_SECONDS.inc(len(samples) / SAMPLE_RATE)
+        if len(self._remainder):
+            samples = np.concatenate((self._remainder, samples))
+
+        n_frames = len(samples) // self.frame_len
+        usable = n_frames * self.frame_len
+        self._remainder = samples[usable:].copy()
+        if n_frames == 0:
+            return b""
+
+        frames = samples[:usable].reshape(n_frames, self.frame_len)
+        power = np.einsum(
+            "ij,ij->i", frames, frames, dtype=np.float64
+        ) / self.frame_len
+        level_db = 10.0 * np.log10(power / _FULL_SCALE_POWER + 1e-12)
+        speech = level_db > self.threshold_db
+
+        idx = np.arange(n_frames)
+        # Hangover: distance to the most recent speech frame (incl. previous calls)
+        last_speech = np.where(speech, idx, -self._since_speech)
+        last_speech = np.maximum.accumulate(last_speech)
+        keep = idx - last_speech <= self.hangover_frames
+
+        # Pre-roll: keep frames shortly before the next speech onset
+        next_speech = np.where(speech, idx, n_frames + self.preroll_frames + 1)
+        next_speech = np.minimum.accumulate(next_speech[::-1])[::-1]
+        keep |= next_speech - idx <= self.preroll_frames
+
+        self._since_speech = int(n_frames - last_speech[-1])
+        n_speech = int(speech.sum())
+        self.frames_total += n_frames
+        self.frames_speech += n_speech
+        VAD_FRAMES.inc(n_speech, kind="speech")
+        VAD_FRAMES.inc(n_frames - n_speech, kind="silence")
+
+        skipped = int((~keep).sum()) * self.frame_len
+
+        out = frames[keep]
+        if speech.any() and len(self._dropped_tail):
+            # Speech right at the start of this call: replay pre-roll from the last
+            missing = self.preroll_frames - int(np.argmax(speech))
+            if missing > 0:
+                replay = self._dropped_tail[-missing:]
+                out = np.concatenate((replay, out))
+                skipped -= replay.size
+        self.samples_skipped += skipped
+        # Replayed pre-roll can make a call's net skip negative; the counter
+        # only moves forward once the total passes what was already exported
+        if self.samples_skipped > self._skipped_exported:
+            VAD_SKIPPED_SECONDS.inc(
+                (self.samples_skipped - self._skipped_exported) / SAMPLE_RATE
+            )
+            self._skipped_exported = self.samples_skipped
+
+        # Remember the trailing run of dropped frames for the next pre-roll
+        if self.preroll_frames:
+            kept_idx = np.flatnonzero(keep)
+            if len(kept_idx):
+                trailing = frames[kept_idx[-1] + 1 :]
+            else:
+                trailing = np.concatenate((self._dropped_tail, frames))
+            self._dropped_tail = trailing[-self.preroll_frames :].copy()
+
+        return out.tobytes()
+
+
+def create_vad_gate() -> Optional[EnergyVADGate]:
+    """Per-connection gate, or None when VAD_GATE is disabled."""
+    if os.getenv("VAD_GATE", "false").lower() != "true":
+        return None
+    return EnergyVADGate()
@@ -0,0 +1,275 @@
+"""
+Offline bulk transcription and point extraction for recorded audio.
+
+Backfills recordings without going through the real-time /ws path:
+
+- Every input (16kHz mono 16-bit WAV, or raw int16 PCM) is memory-mapped,
+  never read into memory as a whole, and cut into chunks of about
+  ``--chunk-seconds`` at the quietest 100 ms near each chunk end.
+- Chunks are transcribed by ``WhisperService.transcribe`` in a process pool.
+  Workers get (file, sample range) and map the file themselves, so no audio
+  is pickled between processes.
+- Each transcribed chunk goes to the LLM for its point, with at most
+  ``--llm-concurrency`` requests in flight.
+- One JSON line per chunk is appended to ``--output`` as soon as it is done:
+  ``{"file", "chunk", "start", "end", "text", "point"}``.
+
+The output file is also the checkpoint. Rerunning the same command skips the
+chunks already in it and retries the ones written with an ``error``: only
+the LLM call when the transcript is there, transcription too when it failed
+(``"text": null``). A failing chunk never stops the rest of the run. When a
+chunk appears more than once, the last line wins. Resume with the same
+``--chunk-seconds``.
+
+Usage (from backend/):
+    python batch_transcribe.py --output points.jsonl meetings/*.wav
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+# Cut points are searched for in this last fraction of each chunk
+SPLIT_SEARCH_FRACTION = 0.2
+SPLIT_FRAME = SAMPLE_RATE // 10  # 100 ms
+
+
+def _wav_data_offset(path: str) -> tuple[int, int]:
+    """(offset, length) in bytes of the PCM data chunk of a 16kHz mono WAV."""
+    with open(path, "rb") as f:
+        riff, _, wave_id = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave_id != b"WAVE":
+            raise ValueError(f"{path}: not a WAV file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, size = struct.unpack("<4sI", header)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(size - 16 + (size & 1), os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError(f"{path}: data before fmt chunk")
+                tag, channels, rate, _, _, bits = fmt
+                if tag != 1 or channels != 1 or rate != SAMPLE_RATE or bits != 16:
+                    raise ValueError(f"{path}: expected 16kHz mono 16-bit PCM WAV")
+                # Streamed WAVs may leave the size unset; the file end bounds it
+                return f.tell(), min(size, os.path.getsize(path) - f.tell())
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def open_pcm(path: str) -> tuple[np.memmap, int]:
+    """Memory-mapped int16 samples of ``path`` and their byte offset."""
+    if path.endswith(".wav"):
+        offset, length = _wav_data_offset(path)
+    else:
+        offset, length = 0, os.path.getsize(path)
+    count = length // 2
+    if count == 0:
+        return np.zeros(0, dtype="<i2"), offset
+    pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(count,))
+    return pcm, offset
+
+
+def plan_chunks(pcm: np.ndarray, chunk_seconds: float) -> list[tuple[int, int]]:
+    """Sample ranges of about ``chunk_seconds``, cut at the quietest frame.
+
+    Only the search window at the end of every chunk is read, so planning
+    touches a fraction of the mapped file.
+    """
+    size = int(chunk_seconds * SAMPLE_RATE)
+    search = max(SPLIT_FRAME, int(size * SPLIT_SEARCH_FRACTION))
+    chunks = []
+    start = 0
+    while start < len(pcm):
+        end = start + size
+        if end >= len(pcm):
+            chunks.append((start, len(pcm)))
+            break
+        window = pcm[end - search : end].astype(np.float32)
+        frames = window[: len(window) // SPLIT_FRAME * SPLIT_FRAME].reshape(
+            -1, SPLIT_FRAME
+        )
+        quietest = int(np.argmin((frames**2).mean(axis=1)))
+        # Cut in the middle of the quietest frame
+        end = end - search + quietest * SPLIT_FRAME + SPLIT_FRAME // 2
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+# --- worker process ---------------------------------------------------------
+
+_service = None
+_mapped: dict[str, np.memmap] = {}
+
+
+def _init_worker(model_size: Optional[str]):
+    global _service
+    from whisper_service import WhisperService
+
+    _service = WhisperService(model_size=model_size)
+    _service.load()
+
+
+def _transcribe_chunk(path: str, start: int, end: int) -> str:
+    pcm = _mapped.get(path)
+    if pcm is None:
+        pcm = _mapped[path] = open_pcm(path)[0]
+    audio = pcm[start:end].astype(np.float32) / 32768.0
+    return _service.transcribe(audio)
+
+
+# --- driver -----------------------------------------------------------------
+
+
+def load_checkpoint(path: str) -> dict[tuple[str, int], dict]:
+    """Records already in the output, by (file, chunk); the last line wins."""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                records[(record["file"], record["chunk"])] = record
+            except (ValueError, KeyError, TypeError):
+                # A line cut short by an interrupted run
+                continue
+    return records
+
+
+async def run(args) -> int:
+    from llm_scheduler import scheduler
+    from llm_service import ERROR_MESSAGE, close_client, extract_point
+
+    done = load_checkpoint(args.output)
+    jobs = []
+    for path in args.inputs:
+        pcm, _ = open_pcm(path)
+        chunks = plan_chunks(pcm, args.chunk_seconds)
+        pending = []
+        for index, chunk in enumerate(chunks):
+            record = done.get((path, index))
+            if record is None or "error" in record:
+                pending.append((index, chunk))
+        logger.info(f"{path}: {len(chunks)} chunks, {len(pending)} to process")
+        jobs.extend((path, index, start, end) for index, (start, end) in pending)
+        del pcm
+
+    if not jobs:
+        logger.info("Nothing to do")
+        return 0
+
+    loop = asyncio.get_running_loop()
+    # Requests wait their turn here, not in the scheduler: its LLM_DEADLINE
+    # counts queue time, and every chunk of a backfill is submitted at once
+    llm_slots = asyncio.Semaphore(args.llm_concurrency)
+    scheduler.max_in_flight = args.llm_concurrency
+    failed = 0
+    finished = 0
+    started = time.perf_counter()
+
+    # spawn: workers load torch/whisper themselves instead of forking this process
+    pool = ProcessPoolExecutor(
+        max_workers=args.workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(args.model,),
+    )
+
+    with pool, open(args.output, "a", encoding="utf-8") as out:
+
+        async def process(path: str, index: int, start: int, end: int):
+            nonlocal failed, finished
+            record = {
+                "file": path,
+                "chunk": index,
+                "start": round(start / SAMPLE_RATE, 2),
+                "end": round(end / SAMPLE_RATE, 2),
+                "text": None,
+                "point": None,
+            }
+            previous = done.get((path, index))
+            text = previous.get("text") if previous is not None else None
+            if text is None:
+                try:
+                    text = await loop.run_in_executor(
+                        pool, _transcribe_chunk, path, start, end
+                    )
+                except Exception as e:
+                    # Includes BrokenProcessPool: every later chunk fails too
+                    logger.error(f"{path} chunk {index}: transcription failed: {e!r}")
+                    text = None
+                    record["error"] = f"transcription failed: {e!r}"
+
+            if text is not None:
+                record["text"] = text
+                point = ""
+                if text:
+                    async with llm_slots:
+                        point = await extract_point(text)
+                if point == ERROR_MESSAGE:
+                    record["error"] = point
+                else:
+                    record["point"] = point
+            if "error" in record:
+                failed += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+            finished += 1
+            if finished % 10 == 0 or finished == len(jobs):
+                logger.info(
+                    f"{finished}/{len(jobs)} chunks "
+                    f"({time.perf_counter() - started:.1f}s elapsed)"
+                )
+
+        try:
+            await asyncio.gather(*(process(*job) for job in jobs))
+        finally:
+            await close_client()
+
+    if failed:
+        logger.warning(f"{failed} chunks without a point; rerun to retry them")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("inputs", nargs="+", help="16kHz mono WAV or raw PCM files")
+    parser.add_argument("--output", required=True, help="JSONL output / checkpoint")
+    parser.add_argument("--chunk-seconds", type=float, default=30.0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("BATCH_ASR_WORKERS", "2")),
+        help="transcription processes",
+    )
+    parser.add_argument(
+        "--llm-concurrency",
+        type=int,
+        default=int(os.getenv("BATCH_LLM_CONCURRENCY", "4")),
+    )
+    parser.add_argument("--model", default=None, help="Whisper model (WHISPER_MODEL)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
@@ -0,0 +1,153 @@
+"""
+Point extraction time to first token with the fixed system prompt prefix.
+
+Replays a conversation of ``--pauses`` utterances per session through
+``llm_service.extract_point_stream``. Every request is the fixed system
+prompt plus the transcript, so only the transcript has to be processed once
+the server has cached the prefix; ``llm_service.warm_up`` caches it before
+the first request (compare with ``--no-warmup``).
+
+It reports TTFT p50/p95 as JSON, with each session's first request
+separate from the rest. With ``--spawn`` it runs
+against benchmarks.stub_llm with a simulated prefill cost and prefix cache;
+otherwise it uses the server at ``LLM_BASE_URL`` (set ``LLM_CACHE_PROMPT``
+for llama.cpp servers).
+
+Usage (from backend/):
+    python -m benchmarks.bench_llm_ttft --spawn
+    LLM_BASE_URL=http://localhost:1234/v1 python -m benchmarks.bench_llm_ttft
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+WORDS = (
+    "오늘 회의에서 다음 분기 일정과 예산을 다시 정리해야 할 것 같아요 "
+    "디자인 쪽 검토가 늦어지고 있어서 출시 날짜를 조금 미루는 게 좋겠고 "
+    "대신 베타 테스트를 먼저 진행해서 피드백을 받아보면 어떨까 싶습니다"
+).split()
+
+
+def utterance(rng: np.random.Generator, chars: int) -> str:
+    words = []
+    while sum(len(word) + 1 for word in words) < chars:
+        words.append(WORDS[rng.integers(len(WORDS))])
+    return " ".join(words)
+
+
+def summarize(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    array = np.asarray(values) * 1000.0
+    return {
+        "n": len(values),
+        "p50": round(float(np.percentile(array, 50)), 1),
+        "p95": round(float(np.percentile(array, 95)), 1),
+        "mean": round(float(array.mean()), 1),
+    }
+
+
+async def run_session(llm_service, session: int, args, seed: int) -> list[float]:
+    """TTFT of every pause in one simulated session."""
+    from llm_scheduler import llm_session
+
+    llm_session.set(("bench", seed, session))
+    rng = np.random.default_rng(seed * 1000 + session)
+    ttfts = []
+    for _ in range(args.pauses):
+        transcript = utterance(rng, args.chars)
+        started = time.perf_counter()
+        first = None
+        async for _ in llm_service.extract_point_stream(transcript):
+            if first is None:
+                first = time.perf_counter() - started
+        ttfts.append(first if first is not None else float("nan"))
+    return ttfts
+
+
+async def main(args) -> dict:
+    import llm_service
+
+    # Every replayed transcript is unique; keep the point cache out of the way
+    llm_service.point_cache.max_entries = 0
+    if args.warmup:
+        await llm_service.warm_up()
+
+    sessions = await asyncio.gather(
+        *(
+            asyncio.create_task(run_session(llm_service, i, args, seed=1))
+            for i in range(args.sessions)
+        )
+    )
+    report = {
+        "benchmark": "llm_ttft",
+        "config": vars(args).copy(),
+        "first_ms": summarize([ttfts[0] for ttfts in sessions]),
+        "rest_ms": summarize([t for ttfts in sessions for t in ttfts[1:]]),
+    }
+
+    await llm_service.close_client()
+    return report
+
+
+def spawn_stub(port: int) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.setdefault("STUB_LLM_PREFILL_MS_PER_KCHAR", "400")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_llm", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/v1/models").status_code == 200:
+                break
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    else:
+        process.terminate()
+        raise SystemExit("Timed out waiting for the stub LLM")
+    os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    return process
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spawn", action="store_true", help="use the stub LLM")
+    parser.add_argument("--port", type=int, default=18101, help="port for --spawn")
+    parser.add_argument("--sessions", type=int, default=2)
+    parser.add_argument("--pauses", type=int, default=6, help="per session")
+    parser.add_argument("--chars", type=int, default=200, help="per utterance")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    process = spawn_stub(args.port) if args.spawn else None
+    try:
+        report = asyncio.run(main(args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
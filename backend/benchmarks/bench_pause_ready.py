@@ -0,0 +1,142 @@
+"""
+Pause-to-ready latency: rebuild-per-utterance vs. AudioProcessorPool.
+
+Measures how long the /ws endpoint keeps the user waiting between a pause
+and having a processor ready for the next utterance, excluding point
+extraction:
+
+- rebuild: cancel, ``processor.cleanup()``, new AudioProcessor, ``create_tasks()``
+  (the behaviour before the pool)
+- pool: ``processor_pool.release()`` + ``processor_pool.acquire()``
+
+With ``WHISPER_BACKEND=stub`` it runs offline on stub_asr's engine, whose
+processor start-up cost is ``STUB_ASR_SETUP_MS``.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pause_ready --iterations 20
+    WHISPER_BACKEND=stub STUB_ASR_SETUP_MS=50 python -m benchmarks.bench_pause_ready
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processor_pool import AudioProcessorPool  # noqa: E402
+
+# 0.5 s of silence, 16kHz int16
+UTTERANCE = b"\x00\x00" * 8000
+
+
+async def drain(results_generator):
+    try:
+        async for _ in results_generator:
+            pass
+    except asyncio.CancelledError:
+        pass
+
+
+async def stop_utterance(processor, results_generator):
+    """Feed a short utterance and end the stream, as the pause handler does."""
+    reader = asyncio.create_task(drain(results_generator))
+    await processor.process_audio(UTTERANCE)
+    await processor.process_audio(None)
+    reader.cancel()
+    try:
+        await reader
+    except asyncio.CancelledError:
+        pass
+
+
+def build_engine():
+    if os.getenv("WHISPER_BACKEND") == "stub":
+        from stub_asr import StubTranscriptionEngine
+
+        return StubTranscriptionEngine()
+
+    from whisperlivekit import TranscriptionEngine
+
+    return TranscriptionEngine(
+        model_size=os.getenv("WHISPER_MODEL", "large-v3-turbo"),
+        lan=os.getenv("WHISPER_LANGUAGE", "ko"),
+        backend=os.getenv("WHISPER_BACKEND", "mlx-whisper"),
+        pcm_input=True,
+    )
+
+
+def processor_class(engine):
+    """The engine's own processor class (stub), else WhisperLiveKit's."""
+    cls = getattr(engine, "audio_processor_class", None)
+    if cls is None:
+        from whisperlivekit import AudioProcessor
+
+        cls = AudioProcessor
+    return cls
+
+
+async def bench_rebuild(engine, iterations: int) -> list[float]:
+    AudioProcessor = processor_class(engine)
+    processor = AudioProcessor(transcription_engine=engine, pcm_input=True)
+    results_generator = await processor.create_tasks()
+    timings = []
+    for _ in range(iterations):
+        await stop_utterance(processor, results_generator)
+        start = time.perf_counter()
+        await processor.cleanup()
+        processor = AudioProcessor(transcription_engine=engine, pcm_input=True)
+        results_generator = await processor.create_tasks()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    await processor.cleanup()
+    return timings
+
+
+async def bench_pool(engine, iterations: int, pool_size: int) -> list[float]:
+    pool = AudioProcessorPool(engine, size=pool_size)
+    pool.warm_up()
+    processor, results_generator = await pool.acquire()
+    timings = []
+    for _ in range(iterations):
+        await stop_utterance(processor, results_generator)
+        # Let background refills settle, as between real utterances
+        await asyncio.sleep(0.2)
+        start = time.perf_counter()
+        pool.release(processor)
+        processor, results_generator = await pool.acquire()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    pool.release(processor)
+    await pool.close()
+    return timings
+
+
+def summarize(timings: list[float]) -> dict:
+    ordered = sorted(timings)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    engine = build_engine()
+
+    report = {
+        "rebuild": summarize(await bench_rebuild(engine, args.iterations)),
+        "pool": summarize(await bench_pool(engine, args.iterations, args.pool_size)),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,328 @@
+"""
+End-to-end load and latency benchmark for the /ws endpoint.
+
+N concurrent simulated clients replay 16kHz mono int16 PCM (WAV/raw files,
+one utterance per file, or synthetic speech-like bursts) in real time and
+send ``pause`` at every utterance boundary. Per utterance it measures:
+
+- time to first transcript: first audio frame -> first ``transcript``
+- pause to first point: ``pause`` -> first ``point_chunk``
+- pause to complete: ``pause`` -> ``point_complete``
+
+The session count is ramped (``--sessions 1,2,4,...``); each level reports
+p50/p95/p99, and ``max_sessions`` is the largest level whose p95 pause to
+complete stays within ``--degradation`` x the first level's (and within
+``--slo-ms`` if given) without errors. Results are printed as JSON.
+
+With ``--spawn`` the harness starts the stub LLM (benchmarks.stub_llm) and
+the backend with ``WHISPER_BACKEND=stub``, so it runs offline without a GPU.
+
+Usage (from backend/):
+    python -m benchmarks.load_ws --spawn --sessions 1,2,4,8,16
+    python -m benchmarks.load_ws --url ws://localhost:8000/ws --audio a.wav b.wav
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import wave
+from typing import Optional
+
+import httpx
+import numpy as np
+import websockets
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_RATE = 16000
+METRICS = ("time_to_first_transcript", "pause_to_first_point", "pause_to_complete")
+
+
+def load_utterances(paths: list[str], synthetic_seconds: float) -> list[bytes]:
+    """PCM per utterance: one per file, or a deterministic synthetic one."""
+    if not paths:
+        rng = np.random.default_rng(0)
+        n = int(synthetic_seconds * SAMPLE_RATE)
+        t = np.arange(n) / SAMPLE_RATE
+        # Voiced-like tone with syllable-rate modulation, well above the VAD gate
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)
+        signal = 0.2 * envelope * np.sin(2 * np.pi * 220 * t)
+        signal += 0.01 * rng.standard_normal(n)
+        return [(signal * 32767).astype(np.int16).tobytes()]
+
+    utterances = []
+    for path in paths:
+        if path.endswith(".wav"):
+            with wave.open(path, "rb") as wav:
+                if (
+                    wav.getframerate() != SAMPLE_RATE
+                    or wav.getnchannels() != 1
+                    or wav.getsampwidth() != 2
+                ):
+                    raise SystemExit(f"{path}: expected 16kHz mono 16-bit WAV")
+                utterances.append(wav.readframes(wav.getnframes()))
+        else:
+            with open(path, "rb") as f:
+                utterances.append(f.read())
+    return utterances
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    array = np.asarray(values) * 1000.0
+    return {
+        "n": len(values),
+        "p50": round(float(np.percentile(array, 50)), 1),
+        "p95": round(float(np.percentile(array, 95)), 1),
+        "p99": round(float(np.percentile(array, 99)), 1),
+        "mean": round(float(array.mean()), 1),
+    }
+
+
+async def run_client(
+    url: str,
+    utterances: list[bytes],
+    count: int,
+    frame_ms: int,
+    speed: float,
+    timeout: float,
+    results: dict,
+):
+    """One simulated speaker: stream ``count`` utterances with pauses."""
+    frame_bytes = SAMPLE_RATE * frame_ms // 1000 * 2
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            for i in range(count):
+                pcm = utterances[i % len(utterances)]
+                marks: dict[str, float] = {}
+                complete = asyncio.Event()
+
+                async def receive():
+                    async for raw in ws:
+                        message = json.loads(raw)
+                        now = time.perf_counter()
+                        kind = message.get("type")
+                        if kind == "transcript":
+                            marks.setdefault("first_transcript", now)
+                        elif kind == "point_chunk":
+                            marks.setdefault("first_point", now)
+                        elif kind == "point_complete":
+                            marks["complete"] = now
+                            complete.set()
+                            return
+
+                receiver = asyncio.create_task(receive())
+                started = time.perf_counter()
+                for offset in range(0, len(pcm), frame_bytes):
+                    await ws.send(pcm[offset : offset + frame_bytes])
+                    if speed > 0:
+                        # Pace against the wall clock so send jitter doesn't add up
+                        due = started + (offset + frame_bytes) / 2 / SAMPLE_RATE / speed
+                        delay = due - time.perf_counter()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+
+                paused = time.perf_counter()
+                await ws.send(json.dumps({"type": "pause"}))
+                try:
+                    await asyncio.wait_for(complete.wait(), timeout)
+                except asyncio.TimeoutError:
+                    results["errors"] += 1
+                    continue
+                finally:
+                    receiver.cancel()
+
+                if "first_transcript" in marks:
+                    results["time_to_first_transcript"].append(
+                        marks["first_transcript"] - started
+                    )
+                if "first_point" in marks:
+                    results["pause_to_first_point"].append(
+                        marks["first_point"] - paused
+                    )
+                results["pause_to_complete"].append(marks["complete"] - paused)
+    except (OSError, websockets.WebSocketException) as e:
+        print(f"client error: {e}", file=sys.stderr)
+        results["errors"] += 1
+
+
+async def run_level(args, utterances: list[bytes], sessions: int) -> dict:
+    results = {name: [] for name in METRICS}
+    results["errors"] = 0
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_client(
+                args.url,
+                utterances,
+                args.utterances,
+                args.frame_ms,
+                args.speed,
+                args.timeout,
+                results,
+            )
+            for _ in range(sessions)
+        )
+    )
+    level = {
+        "sessions": sessions,
+        "errors": results["errors"],
+        "wall_seconds": round(time.perf_counter() - started, 2),
+    }
+    for name in METRICS:
+        level[f"{name}_ms"] = percentiles(results[name])
+    return level
+
+
+def _wait_http(url: str, deadline: float):
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Timed out waiting for {url}")
+
+
+def spawn_servers(args) -> list[subprocess.Popen]:
+    """Start the stub LLM and a stub-ASR backend on local ports."""
+    llm_port, backend_port = args.port + 1, args.port
+    env = dict(
+        os.environ,
+        WHISPER_BACKEND="stub",
+        LLM_BASE_URL=f"http://127.0.0.1:{llm_port}/v1",
+        # Identical stub transcripts would otherwise all be cache hits
+        POINT_CACHE_SIZE="0",
+    )
+    output = None if args.server_logs else subprocess.DEVNULL
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.stub_llm", "--port", str(llm_port)],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=output,
+            stderr=output,
+        ),
+        subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--port", str(backend_port), "--log-level", "warning",
+            ],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=output,
+            stderr=output,
+        ),
+    ]
+    deadline = time.monotonic() + 60
+    _wait_http(f"http://127.0.0.1:{llm_port}/v1/models", deadline)
+    _wait_http(f"http://127.0.0.1:{backend_port}/ready", deadline)
+    args.url = f"ws://127.0.0.1:{backend_port}/ws"
+    return processes
+
+
+def _revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args):
+    utterances = load_utterances(args.audio, args.utterance_seconds)
+
+    # One discarded utterance warms connection pools and the processor pool
+    warmup = {name: [] for name in METRICS}
+    warmup["errors"] = 0
+    await run_client(
+        args.url, utterances, 1, args.frame_ms, args.speed, args.timeout, warmup
+    )
+
+    levels = []
+    baseline = None
+    max_sessions = 0
+
+    for sessions in args.sessions:
+        level = await run_level(args, utterances, sessions)
+        levels.append(level)
+        print(f"sessions={sessions}: {level['pause_to_complete_ms']}", file=sys.stderr)
+
+        p95 = level["pause_to_complete_ms"].get("p95")
+        if baseline is None:
+            baseline = p95
+        healthy = (
+            p95 is not None
+            and level["errors"] == 0
+            and p95 <= baseline * args.degradation
+            and (args.slo_ms is None or p95 <= args.slo_ms)
+        )
+        if not healthy:
+            break
+        max_sessions = sessions
+
+    return {
+        "benchmark": "load_ws",
+        "revision": _revision(),
+        "config": {
+            "url": args.url,
+            "spawned": args.spawn,
+            "utterances_per_session": args.utterances,
+            "utterance_sources": args.audio or ["synthetic"],
+            "frame_ms": args.frame_ms,
+            "speed": args.speed,
+            "degradation": args.degradation,
+            "slo_ms": args.slo_ms,
+        },
+        "baseline_p95_pause_to_complete_ms": baseline,
+        "max_sessions": max_sessions,
+        "levels": levels,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/ws")
+    parser.add_argument("--spawn", action="store_true", help="start stub servers")
+    parser.add_argument("--port", type=int, default=18000, help="port for --spawn")
+    parser.add_argument("--server-logs", action="store_true", help="show --spawn logs")
+    parser.add_argument(
+        "--sessions",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1, 2, 4, 8, 16],
+    )
+    parser.add_argument("--utterances", type=int, default=3, help="per session")
+    parser.add_argument("--audio", nargs="*", default=[], help="WAV/raw PCM files")
+    parser.add_argument("--utterance-seconds", type=float, default=3.0)
+    parser.add_argument("--frame-ms", type=int, default=100)
+    parser.add_argument("--speed", type=float, default=1.0, help="0: unpaced")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--degradation", type=float, default=1.5)
+    parser.add_argument("--slo-ms", type=float, default=None)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    processes = spawn_servers(args) if args.spawn else []
+    try:
+        report = asyncio.run(main(args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
@@ -0,0 +1,124 @@
+"""
+Stub OpenAI-compatible chat completions server for offline benchmarks.
+
+Streams a fixed point back as SSE chunks with a configurable time to first
+token and token rate, so point-extraction latency is reproducible without a
+real model:
+
+- STUB_LLM_TTFT_MS: delay before the first chunk (default 150)
+- STUB_LLM_TOKENS_PER_SEC: chunk rate after the first (default 60)
+- STUB_LLM_TOKENS: chunks per response (default 20)
+- STUB_LLM_PREFILL_MS_PER_KCHAR: prompt processing cost per 1000 prompt
+  characters not covered by a cached prefix (default 0). Like a llama.cpp
+  server, the stub remembers recent prompts and only charges for the part
+  after the longest prefix it has already seen.
+
+Usage (from backend/):
+    python -m benchmarks.stub_llm --port 1234
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+TTFT = float(os.getenv("STUB_LLM_TTFT_MS", "150")) / 1000.0
+TOKENS_PER_SEC = float(os.getenv("STUB_LLM_TOKENS_PER_SEC", "60"))
+TOKENS = int(os.getenv("STUB_LLM_TOKENS", "20"))
+PREFILL_PER_CHAR = float(os.getenv("STUB_LLM_PREFILL_MS_PER_KCHAR", "0")) / 1e6
+
+# Recently processed prompts (prompt + response), for the simulated prefix cache
+_prompt_cache: deque[str] = deque(maxlen=64)
+
+app = FastAPI(title="stub-llm")
+
+
+def _chunk(
+    completion_id: str,
+    model: str,
+    content: Optional[str] = None,
+    finish: Optional[str] = None,
+) -> str:
+    delta = {"content": content} if content is not None else {}
+    payload = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def _tokens() -> list[str]:
+    return [f"요지{i} " for i in range(TOKENS)]
+
+
+def _prefill_seconds(messages: list[dict]) -> float:
+    """Simulated prompt processing time for the uncached part of the prompt."""
+    if PREFILL_PER_CHAR <= 0:
+        return 0.0
+    prompt = "".join(f"<{m['role']}>{m['content']}" for m in messages)
+    cached = max(
+        (len(os.path.commonprefix([prompt, seen])) for seen in _prompt_cache),
+        default=0,
+    )
+    _prompt_cache.append(prompt + "<assistant>" + "".join(_tokens()))
+    return (len(prompt) - cached) * PREFILL_PER_CHAR
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "stub", "object": "model"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub")
+    completion_id = f"chatcmpl-stub-{time.monotonic_ns()}"
+    ttft = TTFT + _prefill_seconds(body.get("messages", []))
+
+    if not body.get("stream"):
+        await asyncio.sleep(ttft + TOKENS / TOKENS_PER_SEC)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(_tokens())},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 0, "completion_tokens": TOKENS},
+        }
+
+    async def events():
+        await asyncio.sleep(ttft)
+        for i, token in enumerate(_tokens()):
+            if i:
+                await asyncio.sleep(1.0 / TOKENS_PER_SEC)
+            yield _chunk(completion_id, model, token)
+        yield _chunk(completion_id, model, finish="stop")
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
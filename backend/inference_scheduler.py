@@ -0,0 +1,139 @@
+"""
+Cross-session batched Whisper inference scheduler.
+
+Sessions submit ready audio windows; the scheduler collects windows from all
+active sessions for up to ``max_wait_ms`` and decodes them as a single batch
+in one worker thread, instead of N concurrent single-item model calls
+competing for the same CPU cores.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+from metrics import ASR_BATCH_SIZE, ASR_BATCH_WAIT_SECONDS, QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+
+class BatchInferenceScheduler:
+    """Collects audio windows across sessions and runs them as one batch."""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list], list[str]],
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+    ):
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv("WHISPER_BATCH_MAX_SIZE", "8"))
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv("WHISPER_BATCH_WAIT_MS", "50"))
+
+        self._batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Per-batch statistics
+        self.batches = 0
+        self.items = 0
+        self.last_batch_size = 0
+        self.last_wait_ms = 0.0
+        self.total_wait_ms = 0.0
+
+        QUEUE_DEPTH.set_function(
+            lambda: self._queue.qsize() if self._queue is not None else 0,
+            queue="asr_batch",
+        )
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, audio_data) -> str:
+        """Queue one audio window (PCM bytes or float32 view); wait for its text."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((audio_data, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> list:
+        """Wait for the first item, then gather more until the budget expires."""
+        batch = [await self._queue.get()]
+        deadline = batch[0][2] + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # Skip windows whose sessions went away while waiting
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            wait_ms = (time.perf_counter() - batch[0][2]) * 1000.0
+            self._record(len(batch), wait_ms)
+
+            try:
+                texts = await asyncio.to_thread(
+                    self._batch_fn, [audio for audio, _, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"Batched transcription failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future, _), text in zip(batch, texts):
+                if not future.done():
+                    future.set_result(text)
+
+    def _record(self, batch_size: int, wait_ms: float):
+        self.batches += 1
+        self.items += batch_size
+        self.last_batch_size = batch_size
+        self.last_wait_ms = wait_ms
+        self.total_wait_ms += wait_ms
+        ASR_BATCH_SIZE.observe(batch_size)
+        ASR_BATCH_WAIT_SECONDS.observe(wait_ms / 1000.0)
+        logger.debug(f"Whisper batch: size={batch_size}, wait={wait_ms:.1f}ms")
+
+    def stats(self) -> dict:
+        """Cumulative and last-batch statistics."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "last_batch_size": self.last_batch_size,
+            "last_wait_ms": round(self.last_wait_ms, 2),
+            "avg_batch_size": round(self.items / self.batches, 2)
+            if self.batches
+            else 0.0,
+            "avg_wait_ms": round(self.total_wait_ms / self.batches, 2)
+            if self.batches
+            else 0.0,
+        }
+
+    async def stop(self):
+        """Cancel the worker task."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
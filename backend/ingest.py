@@ -0,0 +1,249 @@
+"""
+Per-connection bounded ingest queue between the WebSocket and ASR.
+
+The receive loop only decodes and gates audio, then queues it. A consumer
+task feeds the ASR backend. A session whose ASR falls behind therefore
+builds up a bounded queue instead of unbounded socket buffers and latency.
+When the queue is full (``INGEST_QUEUE_SIZE`` frames or
+``INGEST_MAX_SECONDS`` of audio), ``INGEST_POLICY`` decides:
+
+- ``coalesce`` (default): new audio is appended to the last queued frame,
+  so the backend gets fewer, larger frames (one inference call instead of
+  many). Past the audio limit the oldest audio is dropped.
+- ``drop-oldest``: the oldest queued frames are dropped.
+- ``backpressure``: nothing is dropped. The client gets
+  ``{"type": "slow_down", "active": true}`` and the receive loop waits for
+  room, which also stops reading from the socket. Once the queue has
+  drained to half, the client gets ``{"type": "slow_down", "active": false}``.
+
+Queue lag (frame arrival -> handed to ASR) is exported per backend, and the
+worst lag of any live session is exported as a gauge. While a frame is being
+consumed its arrival time is in ``frame_received_at``, so the consumer can
+report how far behind real time the session is (e.g. to the ASR governor).
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from metrics import (
+    INGEST_DROPPED_SECONDS,
+    INGEST_LAG_SECONDS,
+    INGEST_MAX_LAG_SECONDS,
+    QUEUE_DEPTH,
+)
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+INGEST_POLICIES = ("coalesce", "drop-oldest", "backpressure")
+
+# Live queues, for the queue-depth and worst-lag gauges at scrape time
+_queues: "weakref.WeakSet[IngestQueue]" = weakref.WeakSet()
+QUEUE_DEPTH.set_function(
+    lambda: sum(queue.queue_depth for queue in list(_queues)), queue="ingest"
+)
+INGEST_MAX_LAG_SECONDS.set_function(
+    lambda: max((queue.lag for queue in list(_queues)), default=0.0)
+)
+
+
+class IngestQueue:
+    """Bounded audio queue drained into the ASR backend by one consumer task."""
+
+    def __init__(
+        self,
+        consume: Callable[[bytes], Awaitable],
+        backend: str,
+        notify: Optional[Callable[[dict], Awaitable]] = None,
+        max_frames: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        policy: Optional[str] = None,
+    ):
+        if max_frames is None:
+            max_frames = int(os.getenv("INGEST_QUEUE_SIZE", "32"))
+        if max_seconds is None:
+            max_seconds = float(os.getenv("INGEST_MAX_SECONDS", "5.0"))
+        if policy is None:
+            policy = os.getenv("INGEST_POLICY", "coalesce")
+        if policy not in INGEST_POLICIES:
+            logger.warning(f"Unknown INGEST_POLICY {policy!r}, using coalesce")
+            policy = "coalesce"
+
+        self.consume = consume
+        self.backend = backend
+        self.notify = notify
+        self.max_frames = max(1, max_frames)
+        self.max_bytes = int(max_seconds * BYTES_PER_SECOND)
+        self.policy = policy
+        # Entries are [audio, received_at]; audio becomes a bytearray once
+        # something is coalesced into it
+        self._queue: deque[list] = deque()
+        self._bytes = 0
+        self._has_items = asyncio.Event()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._throttled = False
+        self._error: Optional[BaseException] = None
+        self._task: Optional[asyncio.Task] = None
+        # Arrival time of the frame being consumed (None when idle)
+        self.frame_received_at: Optional[float] = None
+
+        self.frames = 0
+        self.coalesced = 0
+        self.dropped_bytes = 0
+        self.slowdowns = 0
+        self.max_lag = 0.0
+        _queues.add(self)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    @property
+    def lag(self) -> float:
+        """Age of the oldest queued frame (seconds)."""
+        if not self._queue:
+            return 0.0
+        return time.perf_counter() - self._queue[0][1]
+
+    def _full(self) -> bool:
+        return len(self._queue) >= self.max_frames or self._bytes >= self.max_bytes
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def put(self, audio: bytes, received_at: float):
+        """Queue audio received at ``received_at`` (``time.perf_counter()``)."""
+        self._raise_error()
+        self.frames += 1
+
+        if self.policy == "backpressure":
+            while self._full():
+                if not self._throttled:
+                    self._throttled = True
+                    self.slowdowns += 1
+                    await self._notify(True)
+                self._has_room.clear()
+                await self._has_room.wait()
+                self._raise_error()
+        elif len(self._queue) >= self.max_frames:
+            if self.policy == "coalesce":
+                tail = self._queue[-1]
+                if not isinstance(tail[0], bytearray):
+                    tail[0] = bytearray(tail[0])
+                tail[0] += audio
+                self._bytes += len(audio)
+                self.coalesced += 1
+                self._trim()
+                return
+            self._drop_oldest()
+
+        self._queue.append([audio, received_at])
+        self._bytes += len(audio)
+        self._trim()
+        self._idle.clear()
+        self._has_items.set()
+
+    def _drop_oldest(self):
+        audio, _ = self._queue.popleft()
+        self._bytes -= len(audio)
+        self.dropped_bytes += len(audio)
+        INGEST_DROPPED_SECONDS.inc(len(audio) / BYTES_PER_SECOND, backend=self.backend)
+
+    def _trim(self):
+        """Enforce the audio limit by dropping the oldest queued audio."""
+        while self._bytes > self.max_bytes and len(self._queue) > 1:
+            self._drop_oldest()
+
+    async def _notify(self, active: bool):
+        if self.notify is None:
+            return
+        await self.notify({
+            "type": "slow_down",
+            "active": active,
+            "queued_seconds": round(self._bytes / BYTES_PER_SECOND, 2),
+        })
+
+    async def _run(self):
+        try:
+            while True:
+                if not self._queue:
+                    self._idle.set()
+                    self._has_items.clear()
+                    await self._has_items.wait()
+                    continue
+
+                audio, received_at = self._queue.popleft()
+                self._bytes -= len(audio)
+                self._has_room.set()
+
+                lag = time.perf_counter() - received_at
+                self.max_lag = max(self.max_lag, lag)
+                INGEST_LAG_SECONDS.observe(lag, backend=self.backend)
+
+                if (
+                    self._throttled
+                    and len(self._queue) <= self.max_frames // 2
+                    and self._bytes <= self.max_bytes // 2
+                ):
+                    self._throttled = False
+                    await self._notify(False)
+
+                self.frame_received_at = received_at
+                await self.consume(bytes(audio))
+                self.frame_received_at = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ingest consumer failed: {e}")
+            self._error = e
+        finally:
+            self._queue.clear()
+            self._bytes = 0
+            self._has_room.set()
+            self._idle.set()
+
+    async def drain(self):
+        """Wait until all queued audio has been handed to the backend."""
+        self._raise_error()
+        await self._idle.wait()
+        self._raise_error()
+
+    async def clear(self):
+        """Drop queued audio (reset) and wait for the frame in progress."""
+        self._queue.clear()
+        self._bytes = 0
+        self._has_room.set()
+        await self.drain()
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "frames": self.frames,
+            "coalesced": self.coalesced,
+            "dropped_seconds": round(self.dropped_bytes / BYTES_PER_SECOND, 2),
+            "slowdowns": self.slowdowns,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+        }
+
+    async def close(self):
+        """Stop the consumer, dropping anything not yet consumed."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,157 @@
+"""
+Global scheduler for requests to the LLM server.
+
+Every LLM call (point extraction, speculation, rolling summaries) takes a
+slot from one process-wide scheduler:
+
+- at most ``LLM_MAX_IN_FLIGHT`` requests run at once, so a burst of pauses
+  queues here instead of flooding the server at ``LLM_BASE_URL``
+- waiting requests are served round-robin across sessions, so one session's
+  backlog never delays another session by more than one request per turn
+- every request has a deadline (``LLM_DEADLINE`` seconds from submission)
+  covering both queue wait and generation
+- ``cancel_session`` cancels a session's queued and running requests at
+  once, for a reset or a disconnect
+
+The session a request belongs to is taken from the ``llm_session`` context
+variable, which the WebSocket handlers set per connection. Tasks created by
+the handler inherit it.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Hashable, Optional
+
+from metrics import (
+    LLM_IN_FLIGHT,
+    LLM_QUEUE_WAIT_SECONDS,
+    LLM_SERVICE_SECONDS,
+    QUEUE_DEPTH,
+)
+
+logger = logging.getLogger(__name__)
+
+# Session of the LLM requests made from the current context (None: no session)
+llm_session: ContextVar[Optional[Hashable]] = ContextVar("llm_session", default=None)
+
+
+class LLMScheduler:
+    """Bounded, per-session fair admission of LLM requests."""
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+    ):
+        if max_in_flight is None:
+            max_in_flight = int(os.getenv("LLM_MAX_IN_FLIGHT", "4"))
+        if deadline_seconds is None:
+            deadline_seconds = float(os.getenv("LLM_DEADLINE", "20.0"))
+        self.max_in_flight = max(1, max_in_flight)
+        self.deadline = deadline_seconds
+        self.in_flight = 0
+        # Session -> its waiting requests; the first session is served next
+        self._waiting: OrderedDict[Hashable, deque[asyncio.Future]] = OrderedDict()
+        # Session -> tasks with a queued or running request
+        self._tasks: dict[Hashable, set[asyncio.Task]] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._waiting.values())
+
+    def _grant_next(self) -> bool:
+        """Hand a free slot to the next session in turn."""
+        while self._waiting:
+            session, queue = self._waiting.popitem(last=False)
+            waiter = queue.popleft()
+            if queue:
+                # Back of the rotation behind every other waiting session
+                self._waiting[session] = queue
+            if not waiter.done():
+                waiter.set_result(None)
+                return True
+        return False
+
+    def _release(self):
+        if not self._grant_next():
+            self.in_flight -= 1
+
+    def _remove(self, session: Hashable, waiter: asyncio.Future):
+        queue = self._waiting.get(session)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            return
+        if not queue:
+            del self._waiting[session]
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        """Hold an in-flight slot; yields the request's deadline (monotonic).
+
+        Raises ``asyncio.TimeoutError`` when the deadline passes in the queue.
+        """
+        session = llm_session.get()
+        task = asyncio.current_task()
+        self._tasks.setdefault(session, set()).add(task)
+        submitted = time.monotonic()
+        deadline = submitted + self.deadline
+        try:
+            if self.in_flight < self.max_in_flight and not self._waiting:
+                self.in_flight += 1
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiting.setdefault(session, deque()).append(waiter)
+                try:
+                    # Not wait_for: on 3.11 it swallows a cancel that lands
+                    # after the slot was granted, and the request would run
+                    async with asyncio.timeout(deadline - time.monotonic()):
+                        await waiter
+                except BaseException:
+                    if waiter.done() and not waiter.cancelled():
+                        # Granted just as the wait ended: pass the slot on
+                        self._release()
+                    else:
+                        self._remove(session, waiter)
+                    raise
+
+            started = time.monotonic()
+            LLM_QUEUE_WAIT_SECONDS.observe(started - submitted)
+            try:
+                yield deadline
+            finally:
+                LLM_SERVICE_SECONDS.observe(time.monotonic() - started)
+                self._release()
+        finally:
+            tasks = self._tasks.get(session)
+            if tasks is not None:
+                tasks.discard(task)
+                if not tasks:
+                    del self._tasks[session]
+
+    def cancel_session(self, session: Hashable):
+        """Cancel every queued or running request of ``session``."""
+        current = asyncio.current_task()
+        cancelled = 0
+        # Drop its queued requests first so none of them is granted a slot
+        for waiter in self._waiting.pop(session, ()):
+            waiter.cancel()
+        for task in list(self._tasks.get(session, ())):
+            if task is not current and not task.done():
+                task.cancel()
+                cancelled += 1
+        if cancelled:
+            logger.info(f"Cancelled {cancelled} LLM request(s) of session {session}")
+
+
+# Shared by every LLM call in the process
+scheduler = LLMScheduler()
+QUEUE_DEPTH.set_function(lambda: scheduler.queue_depth, queue="llm")
+LLM_IN_FLIGHT.set_function(lambda: scheduler.in_flight)
@@ -1,55 +1,163 @@
+import asyncio
 import logging
 import os
+import time
 
-from openai import APIConnectionError, APITimeoutError, OpenAI
+from llm_scheduler import scheduler
+from metrics import LLM_TOKENS_PER_SECOND, LLM_TTFT_SECONDS
+from point_cache import PointCache
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:1234/v1")
 MODEL_NAME = os.getenv("LLM_MODEL", "qwen/qwen3-vl-4b")
 REQUEST_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "12.0"))
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "16"))
+KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30.0"))
 ERROR_MESSAGE = "LLM 서버에 연결할 수 없습니다."
 
 logger.info(f"LLM Service initialized: base_url={BASE_URL}, model={MODEL_NAME}")
 
-client = OpenAI(
-    base_url=BASE_URL,
-    api_key="lmstudio",
-    timeout=REQUEST_TIMEOUT,
-)
+# 모든 세션이 공유하는 비동기 클라이언트 (keep-alive 커넥션 풀 제한).
+# openai/httpx import 비용을 모듈 import 시점이 아닌 첫 요청 시점으로 미룸
+_client = None
+
+
+def get_client():
+    """공유 AsyncOpenAI 클라이언트 (첫 호출 시 생성)"""
+    global _client
+    if _client is None:
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=REQUEST_TIMEOUT,
+        )
+        _client = AsyncOpenAI(
+            base_url=BASE_URL,
+            api_key="lmstudio",
+            timeout=REQUEST_TIMEOUT,
+            http_client=http_client,
+        )
+    return _client
+
 
 SYSTEM_PROMPT = """너는 요지 추출기야. 사용자의 발화에서 핵심 의도와 행동 의미만 남겨.
 한국어로 1~2문장만 출력해. 필러/반복/군더더기 제거.
 설명 추가 없이 요지만 작성해."""
 
+MAX_TOKENS = 150
+TEMPERATURE = 0.3
+
+# llama.cpp 계열 서버에 프롬프트 캐시 재사용 요청 (요청 본문의 cache_prompt)
+CACHE_PROMPT = os.getenv("LLM_CACHE_PROMPT", "false").lower() == "true"
+EXTRA_BODY = {"cache_prompt": True} if CACHE_PROMPT else None
+
+
+def _messages(transcript: str) -> list[dict]:
+    """고정 접두사(시스템 프롬프트) 뒤에 이번 전사만 붙인 메시지"""
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": transcript},
+    ]
+
+
+# 동일/유사 전사에 대한 요지 결과 캐시 (POINT_CACHE_SIZE=0이면 비활성)
+point_cache = PointCache()
+
+
+def _cache_key(transcript: str) -> str:
+    return PointCache.make_key(
+        transcript,
+        MODEL_NAME,
+        SYSTEM_PROMPT,
+        max_tokens=MAX_TOKENS,
+        temperature=TEMPERATURE,
+    )
+
 
 async def extract_point(transcript: str) -> str:
     """전사 텍스트에서 요지 추출 (스트리밍)"""
     if not transcript.strip():
         return ""
 
+    from openai import APIConnectionError, APITimeoutError
+
+    messages = _messages(transcript)
+    key = _cache_key(transcript) if point_cache.enabled else None
+    if key:
+        cached = await point_cache.get(key)
+        if cached is not None:
+            return "".join(cached).strip()
+
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": transcript},
-            ],
-            max_tokens=150,
-            temperature=0.3,
-        )
+        async with scheduler.slot() as deadline:
+            response = await asyncio.wait_for(
+                get_client().chat.completions.create(
+                    model=MODEL_NAME,
+                    messages=messages,
+                    max_tokens=MAX_TOKENS,
+                    temperature=TEMPERATURE,
+                    extra_body=EXTRA_BODY,
+                ),
+                deadline - time.monotonic(),
+            )
     except APIConnectionError as e:
         logger.error(f"LLM 연결 실패: {e}")
         return ERROR_MESSAGE
     except APITimeoutError as e:
         logger.error(f"LLM 요청 타임아웃: {e}")
         return ERROR_MESSAGE
+    except asyncio.TimeoutError:
+        logger.error(f"LLM 요청 데드라인 초과 ({scheduler.deadline}s)")
+        return ERROR_MESSAGE
     except Exception as e:
         logger.error(f"LLM 요청 중 예외 발생: {e}")
         return ERROR_MESSAGE
 
     content = response.choices[0].message.content
-    return content.strip() if content else ""
+    point = content.strip() if content else ""
+    if key and point:
+        await point_cache.put(key, [point])
+    return point
+
+
+SUMMARY_PROMPT = """너는 발화 요약기야. 긴 발화의 한 구간을 받아 핵심 내용만 남겨.
+한국어로 1~2문장만 출력해. 필러/반복/군더더기 제거.
+설명 추가 없이 요약만 작성해."""
+
+SUMMARY_MAX_TOKENS = 120
+
+
+async def summarize_chunk(text: str) -> str:
+    """긴 발화의 한 구간 요약 (롤링 요약용). 실패하면 원문 구간을 그대로 반환"""
+    try:
+        async with scheduler.slot() as deadline:
+            response = await asyncio.wait_for(
+                get_client().chat.completions.create(
+                    model=MODEL_NAME,
+                    messages=[
+                        {"role": "system", "content": SUMMARY_PROMPT},
+                        {"role": "user", "content": text},
+                    ],
+                    max_tokens=SUMMARY_MAX_TOKENS,
+                    temperature=TEMPERATURE,
+                    extra_body=EXTRA_BODY,
+                ),
+                deadline - time.monotonic(),
+            )
+    except Exception as e:
+        logger.error(f"구간 요약 실패: {e}")
+        return text
+
+    content = response.choices[0].message.content
+    return content.strip() if content else text
 
 
 async def extract_point_stream(transcript: str):
@@ -57,31 +165,115 @@ async def extract_point_stream(transcript: str):
     if not transcript.strip():
         return
 
+    import httpx
+    from openai import APIConnectionError, APITimeoutError
+
+    messages = _messages(transcript)
+    key = _cache_key(transcript) if point_cache.enabled else None
+    if key:
+        cached = await point_cache.get(key)
+        if cached is not None:
+            # 캐시 적중: 저장된 청크를 그대로 재생 (point_chunk 프로토콜 유지)
+            for content in cached:
+                yield content
+            return
+
+    chunks = []
+    first_at = None
+    # 스케줄러 슬롯을 생성이 끝날 때까지 유지. 데드라인은 대기 + 생성 전체에 적용
     try:
-        stream = client.chat.completions.create(
+        async with scheduler.slot() as deadline:
+            requested_at = time.perf_counter()
+            try:
+                stream = await asyncio.wait_for(
+                    get_client().chat.completions.create(
+                        model=MODEL_NAME,
+                        messages=messages,
+                        max_tokens=MAX_TOKENS,
+                        temperature=TEMPERATURE,
+                        stream=True,
+                        extra_body=EXTRA_BODY,
+                    ),
+                    deadline - time.monotonic(),
+                )
+            except APIConnectionError as e:
+                logger.error(f"LLM 스트리밍 연결 실패: {e}")
+                yield ERROR_MESSAGE
+                return
+            except APITimeoutError as e:
+                logger.error(f"LLM 스트리밍 타임아웃: {e}")
+                yield ERROR_MESSAGE
+                return
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                logger.error(f"LLM 스트리밍 요청 중 예외 발생: {e}")
+                yield ERROR_MESSAGE
+                return
+
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            stream.__anext__(), deadline - time.monotonic()
+                        )
+                    except StopAsyncIteration:
+                        break
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if content:
+                        if first_at is None:
+                            first_at = time.perf_counter()
+                            LLM_TTFT_SECONDS.observe(first_at - requested_at)
+                        chunks.append(content)
+                        yield content
+            except (APIConnectionError, APITimeoutError, httpx.TransportError) as e:
+                logger.error(f"LLM 스트리밍 중 연결 끊김: {e}")
+                # 이미 보낸 청크 뒤에 오류 문구를 붙이지 않음 (받은 부분까지만 요지로)
+                if not chunks:
+                    yield ERROR_MESSAGE
+                return
+            finally:
+                await stream.close()
+    except asyncio.TimeoutError:
+        logger.error(f"LLM 스트리밍 데드라인 초과 ({scheduler.deadline}s)")
+        if not chunks:
+            yield ERROR_MESSAGE
+        return
+
+    # 생성 속도: 첫 청크 이후 초당 청크 수 (청크 ≈ 토큰)
+    if len(chunks) > 1:
+        elapsed = time.perf_counter() - first_at
+        if elapsed > 0:
+            LLM_TOKENS_PER_SECOND.observe((len(chunks) - 1) / elapsed)
+
+    # 끝까지 정상 수신한 결과만 캐시
+    if key and chunks:
+        await point_cache.put(key, chunks)
+
+
+async def warm_up():
+    """시작 시 모델 로드와 고정 접두사 프리필을 미리 수행 (첫 요지의 콜드 스타트 제거)"""
+    started = time.perf_counter()
+    try:
+        await get_client().chat.completions.create(
             model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": transcript},
-            ],
-            max_tokens=150,
-            temperature=0.3,
-            stream=True,
+            messages=_messages("안녕하세요."),
+            max_tokens=1,
+            temperature=TEMPERATURE,
+            extra_body=EXTRA_BODY,
         )
-    except APIConnectionError as e:
-        logger.error(f"LLM 스트리밍 연결 실패: {e}")
-        yield ERROR_MESSAGE
-        return
-    except APITimeoutError as e:
-        logger.error(f"LLM 스트리밍 타임아웃: {e}")
-        yield ERROR_MESSAGE
-        return
     except Exception as e:
-        logger.error(f"LLM 스트리밍 요청 중 예외 발생: {e}")
-        yield ERROR_MESSAGE
+        logger.warning(f"LLM 워밍업 실패: {e}")
         return
+    logger.info(f"LLM 워밍업 완료 ({time.perf_counter() - started:.2f}s)")
+
 
-    for chunk in stream:
-        content = chunk.choices[0].delta.content
-        if content:
-            yield content
+async def close_client():
+    """공유 HTTP 커넥션 풀 종료"""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+    point_cache.close()
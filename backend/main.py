@@ -1,42 +1,88 @@
 """
 WhisperLiveKit integration for live-point backend.
-Uses AudioProcessor for real-time transcription with live-point protocol.
+Serves the live-point protocol on top of a pluggable ASR backend
+(WhisperLiveKit AudioProcessors by default, see asr_backends).
 """
 
 import asyncio
 import json
 import logging
 import os
+import time
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from whisperlivekit import AudioProcessor, TranscriptionEngine
-
-from llm_service import extract_point_stream
+from fastapi.responses import JSONResponse, Response
+
+import metrics
+from asr_backends import BackendBusy, create_asr_backend
+from audio_codecs import IngestDecoder
+from audio_gate import create_vad_gate
+from ingest import IngestQueue
+from llm_scheduler import llm_session, scheduler
+from llm_service import close_client, extract_point_stream, warm_up
+from outbound import OutboundSender
+from rolling_summary import create_summarizer
+from session_store import session_store
+from speculative import create_speculator
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
-# Global engine (singleton)
-transcription_engine = None
+# ASR backend from the registry (ASR_ENGINE); WhisperLiveKit unless the
+# legacy WHISPER_BACKEND=stub asks for the stub engine
+asr_backend = create_asr_backend(
+    default="stub" if os.getenv("WHISPER_BACKEND") == "stub" else "whisperlivekit"
+)
+# Set once the ASR backend is usable (readiness, not liveness)
+engine_ready = asyncio.Event()
+engine_error = None
+
+# How long a connection waits for the engine before being turned away (seconds)
+READY_TIMEOUT = float(os.getenv("READY_TIMEOUT", "30.0"))
+
+# Backstop for the final-transcription flush after a pause (seconds)
+FLUSH_TIMEOUT = float(os.getenv("FLUSH_TIMEOUT", "3.0"))
+
+# Prefill the LLM's fixed prompt prefix at startup (first point without cold start)
+LLM_WARMUP = os.getenv("LLM_WARMUP", "true").lower() == "true"
+
+
+async def load_engine():
+    """Load the ASR backend off the event loop."""
+    global engine_error
+    logger.info(f"Initializing ASR backend {asr_backend.name}...")
+    try:
+        await asr_backend.start()
+    except Exception as e:
+        engine_error = str(e)
+        logger.error(f"ASR backend failed to load: {e}")
+        return
+    engine_ready.set()
+    logger.info("ASR backend initialized")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize TranscriptionEngine on startup."""
-    global transcription_engine
-    logger.info("Initializing TranscriptionEngine...")
-    transcription_engine = TranscriptionEngine(
-        model_size=os.getenv("WHISPER_MODEL", "large-v3-turbo"),
-        lan=os.getenv("WHISPER_LANGUAGE", "ko"),
-        backend=os.getenv("WHISPER_BACKEND", "mlx-whisper"),
-        pcm_input=True,  # Direct 16kHz INT16 PCM input
-    )
-    logger.info("TranscriptionEngine initialized")
+    """Start model warm-up in the background so /health answers immediately."""
+    load_task = asyncio.create_task(load_engine())
+    warmup_task = asyncio.create_task(warm_up()) if LLM_WARMUP else None
     yield
+    for task in (load_task, warmup_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await asr_backend.close()
+    await close_client()
+    if session_store:
+        session_store.close()
 
 
 app = FastAPI(title="live-point", lifespan=lifespan)
@@ -52,7 +98,26 @@ app.add_middleware(
 
 @app.get("/health")
 async def health():
-    return {"status": "ok", "whisper_service": "WhisperLiveKit"}
+    """Liveness: the process is up, whether or not the model is loaded."""
+    return {"status": "ok", "whisper_service": asr_backend.name}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: the model is loaded and connections can be served."""
+    if engine_ready.is_set():
+        return {"status": "ready"}
+    if engine_error:
+        return JSONResponse(
+            status_code=503, content={"status": "error", "detail": engine_error}
+        )
+    return JSONResponse(status_code=503, content={"status": "loading"})
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape endpoint."""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 
 @app.websocket("/ws")
@@ -61,62 +126,137 @@ async def websocket_endpoint(websocket: WebSocket):
     WebSocket endpoint for audio streaming.
 
     Protocol:
+    - Query: ?session_id=... resumes the session of a dropped connection
     - Binary messages: Audio chunks (16kHz mono int16 PCM)
     - JSON messages:
+      - {"type": "config", "codec": "mulaw", "sample_rate": 8000, "framed": true}:
+        Negotiate compressed/framed audio (see audio_codecs)
       - {"type": "pause"}: End of speech, trigger point extraction
       - {"type": "reset"}: Clear buffers and start fresh
 
     Responses:
+    - {"type": "session", "session_id": "...", "resumed": true/false}
+    - {"type": "config_ack", "codec": "...", "sample_rate": ..., "framed": ...}
     - {"type": "transcript", "text": "...", "partial": true/false}
     - {"type": "point_chunk", "text": "..."}
     - {"type": "point_complete", "source": "...", "point": "..."}
+    - {"type": "slow_down", "active": true/false, "queued_seconds": ...}:
+      Ingest queue full / drained again (INGEST_POLICY=backpressure)
     """
     await websocket.accept()
     logger.info("WebSocket connection accepted")
 
-    # Create AudioProcessor for this connection
-    processor = AudioProcessor(
-        transcription_engine=transcription_engine,
-        pcm_input=True,
-    )
-
-    # Track accumulated transcript for point extraction
-    transcript_buffer = ""
-    last_confirmed_text = ""
-
-    # Start processing tasks
-    results_generator = await processor.create_tasks()
-
-    # Task to read transcription results and send to client
+    if not engine_ready.is_set() and engine_error is None:
+        try:
+            await asyncio.wait_for(engine_ready.wait(), timeout=READY_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+    if not engine_ready.is_set():
+        logger.warning("Rejecting connection: transcription engine not ready")
+        # 1013: Try Again Later
+        await websocket.close(code=1013, reason="Model not ready")
+        return
+
+    # Coalescing, bounded outbound queue for this connection
+    sender = OutboundSender(websocket)
+    sender.start()
+
+    # Resumable session: a reconnect continues the utterance in progress
+    session = None
+    if session_store:
+        session, resumed = session_store.open(
+            websocket.query_params.get("session_id")
+        )
+        await sender.send({
+            "type": "session",
+            "session_id": session.session_id,
+            "resumed": resumed,
+        })
+        if resumed:
+            logger.info(f"Resumed session {session.session_id}")
+
+    # ASR stream for this connection's first utterance (e.g. a warmed
+    # AudioProcessor with its tasks already created)
+    session_key = id(websocket)
+    try:
+        stream = await asr_backend.open(session_key)
+    except BackendBusy as e:
+        logger.warning(f"Rejecting connection: {e}")
+        await sender.close()
+        if session:
+            session_store.detach(session)
+        # 1013: Try Again Later
+        await websocket.close(code=1013, reason="Server busy")
+        return
+    except Exception as e:
+        # e.g. a processor failed to start: close instead of leaving it open
+        logger.error(f"Failed to open a transcription stream: {e}")
+        await sender.close()
+        if session:
+            session_store.detach(session)
+        # 1011: Internal Error
+        await websocket.close(code=1011, reason="Transcription unavailable")
+        return
+    # Metrics label of the model behind the stream
+    backend = stream.backend
+    # LLM requests from this connection (and tasks it starts) share a fair slot
+    llm_session.set(session_key)
+    metrics.ACTIVE_SESSIONS.inc(backend=backend)
+
+    # Negotiated compressed/framed ingestion (None: raw 16kHz int16 PCM)
+    decoder = None
+
+    # Server-side silence gate (None when VAD_GATE is disabled)
+    vad_gate = create_vad_gate()
+
+    # Continue the confirmed transcript of a resumed utterance
+    if session and session.segments:
+        stream.restore(session.text)
+
+    # Background point generation while speaking (None unless enabled)
+    speculator = create_speculator()
+
+    # Incremental chunk summaries for long utterances (None unless enabled)
+    summarizer = create_summarizer()
+
+    # Arrival time of the oldest audio not yet covered by a confirmed line
+    unconfirmed_since = None
+
+    # Point generation of the last utterance; runs beside the receive loop so
+    # the next utterance can start and a reset or disconnect can cancel it
+    point_task = None
+
+    # Task to read transcription results and send to client. It finishes when
+    # the stream's results are exhausted, i.e. after the final update
+    # following end-of-stream has been sent (the flush signal).
     async def send_transcriptions():
-        nonlocal transcript_buffer, last_confirmed_text
+        nonlocal unconfirmed_since
         try:
-            async for front_data in results_generator:
-                # Convert FrontData to live-point protocol
-
-                # Send confirmed lines (non-partial)
-                if front_data.lines:
-                    full_text = " ".join(line.text for line in front_data.lines if line.text)
-                    if full_text and full_text != last_confirmed_text:
-                        # Extract new portion
-                        new_text = full_text
-                        if last_confirmed_text and full_text.startswith(last_confirmed_text):
-                            new_text = full_text[len(last_confirmed_text):].strip()
-
-                        if new_text:
-                            transcript_buffer += " " + new_text
-                            await websocket.send_json({
-                                "type": "transcript",
-                                "text": new_text,
-                                "partial": False,
-                            })
-                        last_confirmed_text = full_text
-
-                # Send buffer (partial)
-                if front_data.buffer_transcription:
-                    await websocket.send_json({
+            async for update in stream.results():
+                # Send new/changed confirmed text
+                if update.committed and unconfirmed_since is not None:
+                    metrics.CONFIRM_LAG_SECONDS.observe(
+                        time.perf_counter() - unconfirmed_since, backend=backend
+                    )
+                    unconfirmed_since = None
+                for new_text in update.committed:
+                    await sender.send({
                         "type": "transcript",
-                        "text": front_data.buffer_transcription,
+                        "text": new_text,
+                        "partial": not (stream.streaming or update.final),
+                    })
+                    if session:
+                        session_store.append(session, new_text)
+                    if speculator:
+                        speculator.observe(len(new_text), stream.text)
+                    if summarizer:
+                        summarizer.observe(len(new_text), stream.text)
+
+                # Send the unconfirmed hypothesis (partial)
+                if update.partial:
+                    await sender.send({
+                        "type": "transcript",
+                        "text": update.partial,
                         "partial": True,
                     })
 
@@ -127,85 +267,195 @@ async def websocket_endpoint(websocket: WebSocket):
 
     send_task = asyncio.create_task(send_transcriptions())
 
+    # Real-time lag of this session, reported to the ASR governor if the
+    # backend has one (ASR_ENGINE=simulwhisper/fallback/auto)
+    governor = getattr(asr_backend, "governor", None)
+
+    async def feed(audio: bytes):
+        """Hand queued audio to the current stream (follows renewals)."""
+        await stream.feed(audio)
+        if governor:
+            # Arrival to transcribed: queue wait plus inference
+            governor.observe_lag(time.perf_counter() - ingest.frame_received_at)
+
+    # Bounded queue between the receive loop and the ASR stream
+    ingest = IngestQueue(feed, backend=backend, notify=sender.send)
+    ingest.start()
+
+    async def send_point(source, speculation, summaries, paused_at, previous):
+        """Stream the point for one utterance, after the previous one's."""
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            if speculation is not None:
+                # Started while the user was still speaking, on the raw transcript
+                prompt = speculation.source
+                point_stream = speculation.replay()
+            else:
+                # Long utterances: bounded prompt from rolling summaries
+                prompt = await summaries.condense(source) if summaries else source
+                point_stream = extract_point_stream(prompt)
+            point_text = ""
+            async for chunk in point_stream:
+                if not point_text:
+                    metrics.PAUSE_TO_FIRST_POINT_SECONDS.observe(
+                        time.perf_counter() - paused_at, backend=backend
+                    )
+                point_text += chunk
+                await sender.send({
+                    "type": "point_chunk",
+                    "text": chunk,
+                })
+
+            await sender.send({
+                "type": "point_complete",
+                "source": source,
+                "point": point_text,
+            })
+        except asyncio.CancelledError:
+            if previous is not None:
+                previous.cancel()
+            logger.info("Point generation cancelled")
+        except Exception as e:
+            logger.error(f"Error in point generation: {e}")
+        finally:
+            if speculation is not None:
+                speculation.cancel()
+            if summaries is not None:
+                summaries.cancel()
+
+    def cancel_points():
+        """Stop point generation in flight (reset or disconnect)."""
+        if point_task is not None:
+            point_task.cancel()
+        scheduler.cancel_session(session_key)
+        if speculator:
+            speculator.cancel()
+
+    async def next_utterance():
+        """Continue on a fresh ASR stream (e.g. hand back the used processor)."""
+        nonlocal stream, send_task, unconfirmed_since
+        send_task.cancel()
+        try:
+            await send_task
+        except asyncio.CancelledError:
+            pass
+
+        if session:
+            session_store.clear(session)
+        unconfirmed_since = None
+        stream = await asr_backend.renew(stream)
+        send_task = asyncio.create_task(send_transcriptions())
+
     try:
         while True:
             data = await websocket.receive()
+            if data["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(data.get("code", 1000))
 
             if "bytes" in data:
-                # Audio chunk - feed to processor
-                await processor.process_audio(data["bytes"])
+                # Audio chunk - queue for the ASR stream
+                received_at = time.perf_counter()
+                audio = data["bytes"]
+                if decoder:
+                    audio = await decoder.decode_async(audio)
+                if vad_gate:
+                    audio = vad_gate.process(audio)
+                # Empty bytes would signal end-of-stream to a processor
+                if audio:
+                    await ingest.put(audio, received_at)
+                    if unconfirmed_since is None:
+                        unconfirmed_since = received_at
+                metrics.FRAME_INGEST_SECONDS.observe(
+                    time.perf_counter() - received_at, backend=backend
+                )
 
             elif "text" in data:
                 msg = json.loads(data["text"])
 
-                if msg.get("type") == "pause":
-                    # Signal end of audio stream to processor
-                    await processor.process_audio(None)
+                if msg.get("type") == "config":
+                    # Negotiate a compact ingestion format for binary frames
+                    try:
+                        decoder = IngestDecoder.from_config(msg)
+                    except ValueError as e:
+                        await sender.send({"type": "error", "message": str(e)})
+                        continue
+                    await sender.send({
+                        "type": "config_ack",
+                        "codec": decoder.codec if decoder else "pcm16",
+                        "sample_rate": decoder.sample_rate if decoder else 16000,
+                        "framed": decoder.framed if decoder else False,
+                    })
 
-                    # Wait a moment for final transcriptions to process
-                    await asyncio.sleep(0.3)
+                elif msg.get("type") == "pause":
+                    paused_at = time.perf_counter()
+                    if vad_gate:
+                        vad_gate.reset()
 
-                    # Extract point from accumulated transcript
-                    if transcript_buffer.strip():
-                        point_text = ""
-                        async for chunk in extract_point_stream(transcript_buffer):
-                            point_text += chunk
-                            await websocket.send_json({
-                                "type": "point_chunk",
-                                "text": chunk,
-                            })
-
-                        await websocket.send_json({
-                            "type": "point_complete",
-                            "source": transcript_buffer.strip(),
-                            "point": point_text,
-                        })
-
-                    # Cleanup and prepare for next utterance
-                    send_task.cancel()
+                    # Hand over queued audio, then signal end of stream
+                    await ingest.drain()
+                    await stream.end()
+
+                    # Wait until the final transcription has been emitted
                     try:
-                        await send_task
-                    except asyncio.CancelledError:
-                        pass
-                    await processor.cleanup()
+                        await asyncio.wait_for(
+                            asyncio.shield(send_task), timeout=FLUSH_TIMEOUT
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning(
+                            f"Final transcription not flushed within "
+                            f"{FLUSH_TIMEOUT}s, extracting point anyway"
+                        )
+
+                    # Extract point from accumulated transcript
+                    source = stream.text()
+                    if source:
+                        # Claimed now, before the next utterance can start its own
+                        speculation = speculator.take(source) if speculator else None
+                        summaries = summarizer.take() if summarizer else None
+                        point_task = asyncio.create_task(
+                            send_point(
+                                source, speculation, summaries, paused_at, point_task
+                            )
+                        )
 
                     # Reset state for next utterance
-                    transcript_buffer = ""
-                    last_confirmed_text = ""
-                    processor = AudioProcessor(
-                        transcription_engine=transcription_engine,
-                        pcm_input=True,
-                    )
-                    results_generator = await processor.create_tasks()
-                    send_task = asyncio.create_task(send_transcriptions())
+                    if summarizer:
+                        summarizer.reset()
+                    await next_utterance()
 
                 elif msg.get("type") == "reset":
                     # Full reset
-                    send_task.cancel()
-                    try:
-                        await send_task
-                    except asyncio.CancelledError:
-                        pass
-                    await processor.cleanup()
-
-                    transcript_buffer = ""
-                    last_confirmed_text = ""
-                    processor = AudioProcessor(
-                        transcription_engine=transcription_engine,
-                        pcm_input=True,
-                    )
-                    results_generator = await processor.create_tasks()
-                    send_task = asyncio.create_task(send_transcriptions())
+                    if vad_gate:
+                        vad_gate.reset()
+                    cancel_points()
+                    if summarizer:
+                        summarizer.reset()
+                    await ingest.clear()
+                    await next_utterance()
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
+        cancel_points()
+        await ingest.close()
         send_task.cancel()
         try:
             await send_task
         except asyncio.CancelledError:
             pass
-        await processor.cleanup()
+        asr_backend.release(stream)
+        if session:
+            session_store.detach(session)
+        metrics.ACTIVE_SESSIONS.dec(backend=backend)
+        if summarizer:
+            summarizer.reset()
+        await sender.close()
+        if decoder:
+            logger.info(f"Ingest decoder stats: {decoder.stats()}")
+        if vad_gate:
+            logger.info(f"VAD gate stats: {vad_gate.stats()}")
+        logger.info(f"Ingest queue stats: {ingest.stats()}")
         logger.info("WebSocket connection closed")
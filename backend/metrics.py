@@ -0,0 +1,299 @@
+"""
+Prometheus-style metrics for the transcription and point pipeline.
+
+A small in-process registry rendered in the Prometheus text format at
+``/metrics``. Recording is a lock plus a few integer updates, so the
+instrumentation stays on in production. Gauges that describe live objects
+(queue depths, buffer sizes) are computed from callbacks at scrape time,
+which keeps the hot paths free of bookkeeping.
+
+Latency histograms are labeled by ASR backend: the WhisperLiveKit backend
+name (e.g. ``mlx-whisper``) for ``main``, or the session class
+(``SimulWhisperService``, ``WhisperFallbackService``) for the legacy handler.
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, Iterable
+
+_registry: list["_Metric"] = []
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ] + self._samples()
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f"{self.name}_total{_format_labels(self.labelnames, key)} "
+            f"{_format_value(v)}"
+            for key, v in values
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+        self._functions: dict[tuple, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn: Callable[[], float], **labels):
+        """Compute this series from ``fn`` at scrape time."""
+        with self._lock:
+            self._functions[self._key(labels)] = fn
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, fn in functions:
+            try:
+                values[key] = fn()
+            except Exception:
+                continue
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}"
+            for key, v in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Iterable[float], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [per-bucket counts..., sum]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            snapshot = [(key, list(series)) for key, series in self._series.items()]
+        lines = []
+        for key, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# --- pipeline metrics -------------------------------------------------------
+
+FRAME_INGEST_SECONDS = Histogram(
+    "livepoint_frame_ingest_seconds",
+    "Time from receiving an audio frame to queueing it for the ASR backend",
+    ("backend",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+)
+
+# Session backends only (SimulWhisper, fallback): a WhisperLiveKit
+# AudioProcessor runs inference in its own tasks and reports no timings, so
+# for that path use CONFIRM_LAG_SECONDS as the ASR speed signal
+ASR_RTF = Histogram(
+    "livepoint_asr_rtf",
+    "ASR real-time factor (processing time / audio duration)",
+    ("backend",),
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0),
+)
+
+CONFIRM_LAG_SECONDS = Histogram(
+    "livepoint_confirm_lag_seconds",
+    "Time from the oldest unconfirmed audio frame to its confirmed transcript",
+    ("backend",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
+PAUSE_TO_FIRST_POINT_SECONDS = Histogram(
+    "livepoint_pause_to_first_point_token_seconds",
+    "Time from a pause message to the first point_chunk",
+    ("backend",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0),
+)
+
+LLM_TOKENS_PER_SECOND = Histogram(
+    "livepoint_llm_tokens_per_second",
+    "Streamed point generation rate (chunks per second after the first)",
+    buckets=(5, 10, 20, 40, 60, 80, 120, 200, 400),
+)
+
+ACTIVE_SESSIONS = Gauge(
+    "livepoint_active_sessions",
+    "Open transcription sessions",
+    ("backend",),
+)
+
+QUEUE_DEPTH = Gauge(
+    "livepoint_queue_depth",
+    "Items waiting in internal queues",
+    ("queue",),
+)
+
+VAD_INPUT_SECONDS = Counter(
+    "livepoint_vad_input_seconds",
+    "Audio received by the server-side VAD gate",
+)
+
+VAD_SKIPPED_SECONDS = Counter(
+    "livepoint_vad_skipped_seconds",
+    "Audio dropped as silence by the VAD gate before ASR",
+)
+
+VAD_FRAMES = Counter(
+    "livepoint_vad_frames",
+    "VAD gate analysis frames by classification (speech ratio = speech / all)",
+    ("kind",),
+)
+
+ASR_BATCH_SIZE = Histogram(
+    "livepoint_asr_batch_size",
+    "Audio windows decoded together by the batch inference scheduler",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+
+ASR_BATCH_WAIT_SECONDS = Histogram(
+    "livepoint_asr_batch_wait_seconds",
+    "Time the oldest window of a batch waited before decoding started",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0),
+)
+
+ASR_TIER = Gauge(
+    "livepoint_asr_quality_tier",
+    "Current ASR governor tier (0 = full quality)",
+)
+
+BUFFER_BYTES = Gauge(
+    "livepoint_buffer_bytes",
+    "Audio currently held in per-session PCM buffers",
+    ("backend",),
+)
+
+INGEST_LAG_SECONDS = Histogram(
+    "livepoint_ingest_lag_seconds",
+    "Time an audio frame waited in its session's ingest queue",
+    ("backend",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+INGEST_MAX_LAG_SECONDS = Gauge(
+    "livepoint_ingest_max_lag_seconds",
+    "Age of the oldest queued audio frame across all sessions",
+)
+
+INGEST_DROPPED_SECONDS = Counter(
+    "livepoint_ingest_dropped_seconds",
+    "Audio dropped by full ingest queues",
+    ("backend",),
+)
+
+LLM_QUEUE_WAIT_SECONDS = Histogram(
+    "livepoint_llm_queue_wait_seconds",
+    "Time an LLM request waited for a scheduler slot",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0),
+)
+
+LLM_SERVICE_SECONDS = Histogram(
+    "livepoint_llm_service_seconds",
+    "Time an LLM request held its scheduler slot",
+    buckets=(0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 20.0),
+)
+
+LLM_IN_FLIGHT = Gauge(
+    "livepoint_llm_in_flight",
+    "LLM requests currently running",
+)
+
+LLM_TTFT_SECONDS = Histogram(
+    "livepoint_llm_ttft_seconds",
+    "Time from sending a point request to its first streamed chunk",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0),
+)
@@ -0,0 +1,149 @@
+"""
+Per-connection outbound message sender.
+
+Messages go through one bounded queue drained by a single writer task:
+
+- a partial transcript replaces a still-queued partial it supersedes
+- consecutive ``point_chunk`` messages are merged into frames of about
+  ``batch_interval_ms`` instead of one frame per token
+- when the queue is full (slow client), producers wait for room instead of
+  letting server memory grow
+- messages are serialized with orjson when it is installed
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from collections import deque
+from typing import Optional
+
+from fastapi import WebSocket
+
+from metrics import QUEUE_DEPTH
+
+try:
+    import orjson
+
+    def _dumps(message: dict) -> str:
+        return orjson.dumps(message).decode("utf-8")
+
+except ImportError:
+
+    def _dumps(message: dict) -> str:
+        return json.dumps(message, ensure_ascii=False, separators=(",", ":"))
+
+
+logger = logging.getLogger(__name__)
+
+# Live senders, summed into the outbound queue-depth gauge at scrape time
+_senders: "weakref.WeakSet[OutboundSender]" = weakref.WeakSet()
+QUEUE_DEPTH.set_function(
+    lambda: sum(sender.queue_depth for sender in list(_senders)), queue="outbound"
+)
+
+
+def _merge(tail: dict, message: dict) -> bool:
+    """Fold ``message`` into the queued ``tail`` if it supersedes or extends it."""
+    if tail["type"] != message["type"]:
+        return False
+    if message["type"] == "point_chunk":
+        tail["text"] += message["text"]
+        return True
+    if message["type"] == "transcript" and tail.get("partial") and message.get(
+        "partial"
+    ):
+        tail["text"] = message["text"]
+        return True
+    return False
+
+
+class OutboundSender:
+    """Coalescing, rate-limited, bounded sender for one WebSocket."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: Optional[int] = None,
+        batch_interval_ms: Optional[float] = None,
+    ):
+        if max_queue is None:
+            max_queue = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+        if batch_interval_ms is None:
+            batch_interval_ms = float(os.getenv("WS_BATCH_INTERVAL_MS", "40"))
+
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.batch_interval = batch_interval_ms / 1000.0
+        # Entries are [message, enqueued_at]
+        self._queue: deque[list] = deque()
+        self._has_items = asyncio.Event()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+
+        self.frames_sent = 0
+        self.coalesced = 0
+        _senders.add(self)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def send(self, message: dict):
+        """Queue a message; waits while the queue is full (backpressure)."""
+        while not self._closed:
+            if self._queue and _merge(self._queue[-1][0], message):
+                self.coalesced += 1
+                return
+            if len(self._queue) < self.max_queue:
+                self._queue.append([dict(message), time.monotonic()])
+                self._has_items.set()
+                return
+            self._has_room.clear()
+            await self._has_room.wait()
+        logger.debug(f"Dropping message for closed connection: {message['type']}")
+
+    async def _run(self):
+        try:
+            while True:
+                if not self._queue:
+                    self._has_items.clear()
+                    await self._has_items.wait()
+                    continue
+
+                message, enqueued_at = self._queue[0]
+                if message["type"] == "point_chunk" and len(self._queue) == 1:
+                    # Give following tokens a moment to merge into this frame
+                    delay = enqueued_at + self.batch_interval - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                self._queue.popleft()
+                self._has_room.set()
+                await self.websocket.send_text(_dumps(message))
+                self.frames_sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Outbound sender stopped: {e}")
+        finally:
+            self._closed = True
+            self._queue.clear()
+            self._has_room.set()
+
+    async def close(self):
+        """Stop the writer task, dropping anything not yet sent."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
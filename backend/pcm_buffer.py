@@ -0,0 +1,90 @@
+"""
+Preallocated float32 PCM ring buffer for the Whisper services.
+
+Incoming 16kHz int16 frames are converted in place into a fixed float32
+array, and the model is handed views into it instead of fresh copies. The
+array is mirrored (every sample is stored twice, ``capacity`` apart), so any
+window of up to ``capacity`` samples is a single contiguous view even when
+it wraps around. Memory per session is fixed at ``2 * capacity * 4`` bytes.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+_INT16_SCALE = np.float32(1.0 / 32768.0)
+
+
+class PCMRingBuffer:
+    """Fixed-size float32 ring of the most recent audio."""
+
+    def __init__(self, capacity_seconds: Optional[float] = None):
+        if capacity_seconds is None:
+            capacity_seconds = float(os.getenv("PCM_BUFFER_SECONDS", "30"))
+        self.capacity = int(capacity_seconds * SAMPLE_RATE)
+        self._data = np.zeros(2 * self.capacity, dtype=np.float32)
+        # Absolute sample positions of the oldest and next-to-write samples
+        self._start = 0
+        self._end = 0
+        self.overflow_samples = 0
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def buffered_bytes(self) -> int:
+        """Memory occupied by the currently buffered samples."""
+        return len(self) * self._data.itemsize
+
+    @property
+    def nbytes(self) -> int:
+        """Fixed memory ceiling of this buffer."""
+        return self._data.nbytes
+
+    def write(self, pcm: bytes) -> np.ndarray:
+        """Append int16 PCM and return a view of the converted samples."""
+        src = np.frombuffer(pcm, dtype=np.int16)
+        if len(src) > self.capacity:
+            self.overflow_samples += len(src) - self.capacity
+            src = src[-self.capacity :]
+        n = len(src)
+        if n == 0:
+            return self._data[:0]
+
+        overflow = len(self) + n - self.capacity
+        if overflow > 0:
+            # Oldest audio is overwritten; keep the ceiling fixed
+            self._start += overflow
+            self.overflow_samples += overflow
+            logger.warning(f"PCM ring buffer overflow: dropped {overflow} samples")
+
+        cap = self.capacity
+        pos = self._end % cap
+        first = min(n, cap - pos)
+        np.multiply(src[:first], _INT16_SCALE, out=self._data[pos : pos + first])
+        self._data[cap + pos : cap + pos + first] = self._data[pos : pos + first]
+        if first < n:
+            rest = n - first
+            np.multiply(src[first:], _INT16_SCALE, out=self._data[:rest])
+            self._data[cap : cap + rest] = self._data[:rest]
+
+        self._end += n
+        return self._data[pos : pos + n]
+
+    def view(self, n: Optional[int] = None) -> np.ndarray:
+        """Contiguous view of the oldest ``n`` buffered samples (all by default)."""
+        length = len(self) if n is None else min(n, len(self))
+        pos = self._start % self.capacity
+        return self._data[pos : pos + length]
+
+    def consume(self, n: int):
+        """Drop the oldest ``n`` samples."""
+        self._start += max(0, min(n, len(self)))
+
+    def clear(self):
+        self._start = self._end
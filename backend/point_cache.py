@@ -0,0 +1,194 @@
+"""
+Content-addressed cache for LLM point extraction results.
+
+Keys hash the normalized transcript together with everything that affects
+the output (model, system prompt, sampling parameters). Entries are kept in
+an in-memory LRU with size and TTL limits, optionally backed by SQLite so
+they survive restarts. Streamed results are stored as their chunk list, so a
+hit can be replayed as the same sequence of ``point_chunk`` messages.
+
+The SQLite table is bounded too: every write drops expired rows and keeps
+at most ``POINT_CACHE_DB_SIZE`` of the newest. All SQLite calls, opening
+the database included (on first use), run on one dedicated thread, so the
+event loop never waits on disk I/O and the connection is only ever used by
+a single writer.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_transcript(text: str) -> str:
+    """Unicode-normalize, casefold and collapse whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+
+class PointCache:
+    """LRU + TTL cache of point chunks with an optional SQLite backing store."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None,
+        db_max_entries: Optional[int] = None,
+    ):
+        if max_entries is None:
+            max_entries = int(os.getenv("POINT_CACHE_SIZE", "512"))
+        if ttl is None:
+            ttl = float(os.getenv("POINT_CACHE_TTL", "3600"))
+        if path is None:
+            path = os.getenv("POINT_CACHE_PATH", "")
+        if db_max_entries is None:
+            db_max_entries = int(os.getenv("POINT_CACHE_DB_SIZE", "10000"))
+
+        self.max_entries = max_entries
+        self.db_max_entries = db_max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, list[str]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_thread: Optional[ThreadPoolExecutor] = None
+        if path:
+            self._db_thread = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="point-cache"
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(transcript: str, model: str, system_prompt: str, **params) -> str:
+        payload = json.dumps(
+            [normalize_transcript(transcript), model, system_prompt, params],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        """The SQLite connection, opened on first use (on the SQLite thread)."""
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS points ("
+                "key TEXT PRIMARY KEY, chunks TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS points_expires_at ON points (expires_at)"
+            )
+            db.execute("DELETE FROM points WHERE expires_at < ?", (time.time(),))
+            db.commit()
+            self._db = db
+            logger.info(f"Point cache backed by SQLite: {self.path}")
+        return self._db
+
+    def _call_db(self, fn, *args):
+        return fn(self._connection(), *args)
+
+    async def _run_db(self, fn, *args):
+        """Run ``fn(db, *args)`` on the SQLite thread."""
+        if self._db_thread is None:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._db_thread, self._call_db, fn, *args
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Point cache SQLite error: {e}")
+            return None
+
+    @staticmethod
+    def _db_get(db: sqlite3.Connection, key: str):
+        return db.execute(
+            "SELECT chunks, expires_at FROM points WHERE key = ?", (key,)
+        ).fetchone()
+
+    @staticmethod
+    def _db_put(
+        db: sqlite3.Connection, key: str, chunks: str, expires_at: float, limit: int
+    ):
+        db.execute(
+            "INSERT OR REPLACE INTO points (key, chunks, expires_at) VALUES (?, ?, ?)",
+            (key, chunks, expires_at),
+        )
+        db.execute("DELETE FROM points WHERE expires_at < ?", (time.time(),))
+        # Every entry has the same TTL, so the earliest expiry is the oldest
+        db.execute(
+            "DELETE FROM points WHERE key NOT IN "
+            "(SELECT key FROM points ORDER BY expires_at DESC LIMIT ?)",
+            (limit,),
+        )
+        db.commit()
+
+    @staticmethod
+    def _db_delete(db: sqlite3.Connection, key: str):
+        db.execute("DELETE FROM points WHERE key = ?", (key,))
+        db.commit()
+
+    async def get(self, key: str) -> Optional[list[str]]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is None and self._db_thread is not None:
+            row = await self._run_db(self._db_get, key)
+            if row:
+                entry = (row[1], json.loads(row[0]))
+                self._remember(key, entry)
+
+        if entry is None or entry[0] < now:
+            if entry is not None:
+                await self._forget(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def put(self, key: str, chunks: list[str]):
+        entry = (time.time() + self.ttl, list(chunks))
+        self._remember(key, entry)
+        if self._db_thread is not None:
+            await self._run_db(
+                self._db_put,
+                key,
+                json.dumps(entry[1], ensure_ascii=False),
+                entry[0],
+                self.db_max_entries,
+            )
+
+    def _remember(self, key: str, entry: tuple[float, list[str]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _forget(self, key: str):
+        self._entries.pop(key, None)
+        if self._db_thread is not None:
+            await self._run_db(self._db_delete, key)
+
+    def close(self):
+        """Finish pending writes, then close the database."""
+        if self._db_thread is not None:
+            self._db_thread.shutdown(wait=True)
+            self._db_thread = None
+        if self._db is not None:
+            self._db.close()
+            self._db = None
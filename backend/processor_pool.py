@@ -0,0 +1,107 @@
+"""
+Pool of warmed WhisperLiveKit AudioProcessors.
+
+An AudioProcessor cannot be restarted once its stream has ended, so the
+WebSocket endpoint used to tear one down and build a new one (plus
+``create_tasks()``) on every pause and reset, while the user waited. The pool
+keeps processors with their tasks already created; on pause the endpoint
+hands the used one back, gets a warm one immediately, and the cleanup and
+refill happen in the background.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AudioProcessorPool:
+    """Keeps ``size`` AudioProcessors warmed and ready to hand out."""
+
+    def __init__(self, transcription_engine, size: Optional[int] = None):
+        if size is None:
+            size = int(os.getenv("PROCESSOR_POOL_SIZE", "2"))
+        self.transcription_engine = transcription_engine
+        self.size = size
+        self._ready: list = []
+        self._refill_task: Optional[asyncio.Task] = None
+        self._background: set[asyncio.Task] = set()
+
+    @property
+    def ready_count(self) -> int:
+        return len(self._ready)
+
+    async def _build(self):
+        # Engines such as stub_asr's provide their own processor class
+        AudioProcessor = getattr(
+            self.transcription_engine, "audio_processor_class", None
+        )
+        if AudioProcessor is None:
+            from whisperlivekit import AudioProcessor
+
+        processor = AudioProcessor(
+            transcription_engine=self.transcription_engine,
+            pcm_input=True,
+        )
+        results_generator = await processor.create_tasks()
+        return processor, results_generator
+
+    async def _refill(self):
+        while len(self._ready) < self.size:
+            try:
+                self._ready.append(await self._build())
+            except Exception as e:
+                logger.error(f"Failed to warm AudioProcessor: {e}")
+                return
+
+    def _schedule_refill(self):
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    def warm_up(self):
+        """Start filling the pool in the background."""
+        self._schedule_refill()
+
+    async def acquire(self, session_key=None):
+        """Get a ready ``(processor, results_generator)`` pair.
+
+        ``session_key`` is accepted for parity with ``RemoteProcessorPool``;
+        in-process there is nothing to stick to.
+        """
+        if self._ready:
+            item = self._ready.pop()
+        else:
+            item = await self._build()
+        self._schedule_refill()
+        return item
+
+    async def _retire(self, processor):
+        try:
+            await processor.cleanup()
+        except Exception as e:
+            logger.error(f"AudioProcessor cleanup failed: {e}")
+
+    def release(self, processor):
+        """Hand back a used processor; it is cleaned up in the background."""
+        task = asyncio.create_task(self._retire(processor))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def forget(self, session_key):
+        """No-op counterpart of ``RemoteProcessorPool.forget``."""
+
+    async def close(self):
+        """Clean up warmed processors and wait for pending cleanups."""
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+        while self._ready:
+            processor, _ = self._ready.pop()
+            await self._retire(processor)
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
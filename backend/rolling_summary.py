@@ -0,0 +1,128 @@
+"""
+Rolling summarization for long utterances.
+
+Point extraction used to send the whole accumulated transcript in one prompt,
+so a long stretch of speech without a pause grew prompt size, latency and
+cost without limit. With rolling summarization the confirmed transcript is
+cut into chunks of about ``chunk_chars`` characters at word boundaries, and
+each chunk is summarized in the background while speech is still arriving.
+When there are more than ``max_parts`` summaries, the two oldest are merged
+into a summary of summaries, so the history stays a fixed number of parts.
+
+At pause time the point prompt is those summaries plus the not-yet-summarized
+tail, which bounds it to roughly ``max_parts`` short summaries plus one chunk.
+Short utterances never reach a chunk and use the transcript unchanged.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Callable, Optional
+
+from llm_service import summarize_chunk
+
+logger = logging.getLogger(__name__)
+
+
+class UtteranceSummaries:
+    """Chunk summaries of one finished utterance."""
+
+    def __init__(self, parts: list[asyncio.Task], offset: int):
+        self._parts = parts
+        self._offset = offset
+
+    async def condense(self, transcript: str) -> str:
+        """Point prompt for ``transcript``: summaries so far plus the recent tail."""
+        summaries = await asyncio.gather(*self._parts)
+        tail = transcript[self._offset :].strip()
+        logger.info(
+            f"Rolling summary: {len(summaries)} parts + {len(tail)} chars "
+            f"instead of {len(transcript)} chars"
+        )
+        lines = ["이전 발화 요약:"] + [f"- {summary}" for summary in summaries]
+        if tail:
+            lines += ["", "최근 발화:", tail]
+        return "\n".join(lines)
+
+    def cancel(self):
+        for task in self._parts:
+            task.cancel()
+
+
+class RollingSummarizer:
+    """Per-connection incremental summaries of the confirmed transcript."""
+
+    def __init__(
+        self,
+        chunk_chars: Optional[int] = None,
+        max_parts: Optional[int] = None,
+    ):
+        if chunk_chars is None:
+            chunk_chars = int(os.getenv("SUMMARY_CHUNK_CHARS", "800"))
+        if max_parts is None:
+            max_parts = int(os.getenv("SUMMARY_MAX_PARTS", "4"))
+        self.chunk_chars = chunk_chars
+        self.max_parts = max(2, max_parts)
+        # Characters of the transcript already handed to chunk summaries
+        self._offset = 0
+        self._pending_chars = 0
+        # Summaries in transcript order, possibly still being generated
+        self._parts: list[asyncio.Task] = []
+
+    def observe(self, new_chars: int, get_transcript: Callable[[], str]):
+        """Record newly confirmed text; summarize every full chunk."""
+        self._pending_chars += new_chars
+        if self._pending_chars < self.chunk_chars:
+            return
+        text = get_transcript()
+        while len(text) - self._offset >= self.chunk_chars:
+            end = self._boundary(text)
+            self._parts.append(
+                asyncio.create_task(summarize_chunk(text[self._offset : end].strip()))
+            )
+            self._offset = end
+            if len(self._parts) > self.max_parts:
+                first, second = self._parts[:2]
+                self._parts[:2] = [asyncio.create_task(self._merge(first, second))]
+        self._pending_chars = len(text) - self._offset
+
+    def _boundary(self, text: str) -> int:
+        """End of the next chunk: the last space before the size limit."""
+        limit = self._offset + self.chunk_chars
+        space = text.rfind(" ", self._offset + self.chunk_chars // 2, limit)
+        return space if space != -1 else limit
+
+    async def _merge(self, first: asyncio.Task, second: asyncio.Task) -> str:
+        summaries = await asyncio.gather(first, second)
+        merged = await summarize_chunk("\n".join(summaries))
+        # A failed summary returns its input; keep the part bounded regardless
+        return merged[: self.chunk_chars]
+
+    def take(self) -> Optional[UtteranceSummaries]:
+        """At a pause: hand over this utterance's summaries and start over.
+
+        The summaries keep running; the point task condenses them later, so
+        the receive loop never waits for them.
+        """
+        if not self._parts:
+            self.reset()
+            return None
+        summaries = UtteranceSummaries(self._parts, self._offset)
+        self._parts = []
+        self.reset()
+        return summaries
+
+    def reset(self):
+        """Start over for the next utterance (pause, reset or disconnect)."""
+        for task in self._parts:
+            task.cancel()
+        self._parts = []
+        self._offset = 0
+        self._pending_chars = 0
+
+
+def create_summarizer() -> Optional[RollingSummarizer]:
+    """Per-connection summarizer, or None unless ROLLING_SUMMARY is enabled."""
+    if os.getenv("ROLLING_SUMMARY", "false").lower() != "true":
+        return None
+    return RollingSummarizer()
@@ -0,0 +1,182 @@
+"""
+Resumable transcription sessions.
+
+Every /ws connection belongs to a session with an ID that the client gets in
+a ``session`` message and passes back as ``?session_id=`` when it reconnects.
+The session keeps the confirmed transcript of the current utterance, so a
+reconnect continues where the dropped connection stopped instead of starting
+cold: nothing is re-sent or re-transcribed, and the next pause still extracts
+the point from everything said since the last one. The same text is the ASR
+context (prompt words) for backends that accept one.
+
+State lives in memory and, with ``SESSION_STORE_DIR``, in one append-only
+JSONL file per session, so sessions also survive a server restart. A file
+only holds the current utterance: it is truncated at every utterance
+boundary. File writes run in order on one background thread, off the event
+loop. Detached sessions are evicted after ``SESSION_IDLE_TTL`` seconds.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class SessionState:
+    session_id: str
+    # Confirmed transcript deltas of the current utterance
+    segments: list[str] = field(default_factory=list)
+    last_seen: float = field(default_factory=time.monotonic)
+    attached: bool = False
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.segments)
+
+
+class SessionStore:
+    """In-memory sessions with optional append-only JSONL persistence."""
+
+    def __init__(
+        self, directory: Optional[str] = None, idle_ttl: Optional[float] = None
+    ):
+        if directory is None:
+            directory = os.getenv("SESSION_STORE_DIR", "")
+        if idle_ttl is None:
+            idle_ttl = float(os.getenv("SESSION_IDLE_TTL", "300"))
+        self.directory = directory
+        self.idle_ttl = idle_ttl
+        self._sessions: dict[str, SessionState] = {}
+        self._file_thread: Optional[ThreadPoolExecutor] = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._sweep_files()
+            # One thread keeps each session's writes in order
+            self._file_thread = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="session-store"
+            )
+            logger.info(f"Session store backed by: {directory}")
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.jsonl")
+
+    def _submit(self, fn, *args):
+        """Run ``fn(*args)`` on the file thread without waiting for it."""
+        if self._file_thread is not None:
+            self._file_thread.submit(fn, *args)
+
+    @staticmethod
+    def _append_line(path: str, line: str, truncate: bool):
+        try:
+            with open(path, "w" if truncate else "a") as f:
+                f.write(line)
+        except OSError as e:
+            logger.error(f"Failed to write session file {path}: {e}")
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _write(self, session_id: str, record: dict, truncate: bool = False):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._submit(self._append_line, self._path(session_id), line, truncate)
+
+    def _load(self, session_id: str) -> Optional[SessionState]:
+        if not self.directory:
+            return None
+        path = self._path(session_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.idle_ttl:
+                os.remove(path)
+                return None
+            with open(path) as f:
+                records = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return None
+
+        state = SessionState(session_id)
+        for record in records:
+            if record.get("t") == "text":
+                state.segments.append(record["v"])
+        return state
+
+    def open(self, session_id: Optional[str]) -> tuple[SessionState, bool]:
+        """Resume ``session_id`` if it is known, else start a new session.
+
+        Returns:
+            (state, resumed)
+        """
+        self.evict_idle()
+        state = None
+        if session_id and _SESSION_ID.match(session_id):
+            state = self._sessions.get(session_id) or self._load(session_id)
+        # A session can only be driven by one connection at a time
+        resumed = state is not None and not state.attached
+        if not resumed:
+            state = SessionState(uuid.uuid4().hex)
+            self._write(state.session_id, {"t": "open"}, truncate=True)
+
+        state.attached = True
+        state.last_seen = time.monotonic()
+        self._sessions[state.session_id] = state
+        return state, resumed
+
+    def append(self, state: SessionState, text: str):
+        """Record a confirmed transcript delta."""
+        state.segments.append(text)
+        self._write(state.session_id, {"t": "text", "v": text})
+
+    def clear(self, state: SessionState):
+        """Utterance boundary (pause or reset): drop the transcript so far."""
+        state.segments = []
+        self._write(state.session_id, {"t": "open"}, truncate=True)
+
+    def detach(self, state: SessionState):
+        """The connection went away; keep the session until it idles out."""
+        state.attached = False
+        state.last_seen = time.monotonic()
+
+    def evict_idle(self):
+        now = time.monotonic()
+        for session_id, state in list(self._sessions.items()):
+            if not state.attached and now - state.last_seen > self.idle_ttl:
+                del self._sessions[session_id]
+                self._submit(self._remove_file, self._path(session_id))
+
+    def close(self):
+        """Finish pending file writes."""
+        if self._file_thread is not None:
+            self._file_thread.shutdown(wait=True)
+            self._file_thread = None
+
+    def _sweep_files(self):
+        """Remove session files left idle past the TTL (e.g. across restarts)."""
+        cutoff = time.time() - self.idle_ttl
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".jsonl") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+
+
+def create_session_store() -> Optional[SessionStore]:
+    """Session store, or None when SESSION_RESUME is disabled."""
+    if os.getenv("SESSION_RESUME", "true").lower() != "true":
+        return None
+    return SessionStore()
+
+
+# Shared by all connections (None when SESSION_RESUME is disabled)
+session_store = create_session_store()
@@ -8,15 +8,76 @@ import logging
 import os
 import platform
 import sys
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional
 
 import numpy as np
 
+from asr_governor import create_governor
+from inference_scheduler import BatchInferenceScheduler
+from metrics import ASR_RTF, BUFFER_BYTES
+from pcm_buffer import PCMRingBuffer
+
 logger = logging.getLogger(__name__)
 
 # Detect Apple Silicon
 IS_APPLE_SILICON = platform.system() == "Darwin" and platform.machine() == "arm64"
 
+SAMPLE_RATE = 16000
+_PUNCTUATION = ".,!?;:\"'()[]…·"
+
+# Live fallback sessions, for the buffered-audio gauge
+_fallback_sessions: "weakref.WeakSet[WhisperFallbackService]" = weakref.WeakSet()
+BUFFER_BYTES.set_function(
+    lambda: sum(s.buffer.buffered_bytes for s in list(_fallback_sessions)),
+    backend="WhisperFallbackService",
+)
+
+
+def _observe_rtf(backend: str, started: float, samples: int, governor=None):
+    """Record processing time relative to the duration of the audio."""
+    if samples:
+        rtf = (time.perf_counter() - started) * SAMPLE_RATE / samples
+        ASR_RTF.observe(rtf, backend=backend)
+        if governor is not None:
+            governor.observe_rtf(rtf)
+
+
+def _normalize_word(word: str) -> str:
+    return word.strip(_PUNCTUATION).lower()
+
+
+def _agreed_prefix(previous: list[str], words: list[tuple]) -> int:
+    """Length of the common word prefix of two consecutive hypotheses."""
+    n = 0
+    for prev, (_, _, word) in zip(previous, words):
+        if _normalize_word(prev) != _normalize_word(word):
+            break
+        n += 1
+    return n
+
+
+# Lightning-SimulWhisper checkout (simulstreaming_whisper and its packages)
+SIMUL_WHISPER_PATH = os.path.join(os.path.dirname(__file__), "simul_whisper")
+
+
+def _simulstreaming():
+    """Import simulstreaming_whisper from the SimulWhisper checkout."""
+    if SIMUL_WHISPER_PATH not in sys.path:
+        sys.path.insert(0, SIMUL_WHISPER_PATH)
+    import simulstreaming_whisper
+
+    return simulstreaming_whisper
+
+
+# SimulWhisper model loads (first use, governor tiers) run one at a time, so a
+# tier change never sets off a load in every session at once
+_model_loader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="simul-load")
+# (model, beams) that failed to load; governor tiers needing one are not retried
+_failed_models: set[tuple[str, int]] = set()
+
 
 class SimulWhisperService:
     """Lightning-SimulWhisper wrapper for real-time streaming transcription."""
@@ -25,40 +86,44 @@ class SimulWhisperService:
         self.model_name = os.getenv("WHISPER_MODEL", "base")
         self.language = os.getenv("WHISPER_LANGUAGE", "ko")
         self.use_coreml = os.getenv("USE_COREML", "true").lower() == "true"
+        # Decoding parameters; an ASRGovernor may change them between utterances
+        self.base_model = self.model_name
+        self.frame_threshold = 25
+        self.min_chunk_size = 0.5
+        self.beams = int(os.getenv("WHISPER_BEAMS", "1"))
+        self.governor = None
         self.online_processor = None
         self.asr = None
         self._initialized = False
-
-    def _init_processor(self):
-        """Initialize the SimulWhisper online processor (lazy loading)."""
-        if self._initialized:
-            return
-
-        # Add simul_whisper to path
-        simul_whisper_path = os.path.join(os.path.dirname(__file__), "simul_whisper")
-        if simul_whisper_path not in sys.path:
-            sys.path.insert(0, simul_whisper_path)
-
+        # Decoding prompt for the current utterance (text restored on reconnect)
+        self.prompt_words = 30
+        self._context: Optional[str] = None
+        # Loaded ASR objects of this session by (model, beams): a tier that was
+        # used before is switched back to without loading anything
+        self._asrs: dict[tuple[str, int], object] = {}
+        # Background load of a tier's model, adopted at a later reset
+        self._pending: Optional[tuple[tuple[str, int], Future]] = None
+        self._pcm = PCMRingBuffer()
+
+    def _build_args(self, model_name: str, beams: int):
         from argparse import Namespace
 
-        from simulstreaming_whisper import simul_asr_factory
-
         # Build args namespace matching simulstreaming_whisper.py expectations
         # model_path should be HuggingFace repo for MLX models
         # Note: turbo models don't have -mlx suffix
-        if "turbo" in self.model_name:
-            model_path = f"mlx-community/whisper-{self.model_name}"
+        if "turbo" in model_name:
+            model_path = f"mlx-community/whisper-{model_name}"
         else:
-            model_path = f"mlx-community/whisper-{self.model_name}-mlx"
+            model_path = f"mlx-community/whisper-{model_name}-mlx"
 
-        args = Namespace(
+        return Namespace(
             log_level="INFO",
-            beams=1,  # Greedy decoding for real-time
+            beams=beams,  # 1: greedy decoding for real-time
             decoder=None,  # Auto-select (greedy for beams=1)
             model_path=model_path,
-            model_name=self.model_name,
+            model_name=model_name,
             cif_ckpt_path=None,
-            frame_threshold=25,
+            frame_threshold=self.frame_threshold,
             audio_min_len=1.0,
             audio_max_len=30.0,
             task="transcribe",
@@ -72,26 +137,108 @@ class SimulWhisperService:
             coreml_encoder_path=None,  # Auto-detect
             coreml_compute_units="ALL",
             lan=self.language,
-            min_chunk_size=0.5,
+            min_chunk_size=self.min_chunk_size,
+        )
+
+    def _load_asr(self, model_name: str, beams: int):
+        """Load a SimulWhisper ASR (model weights and decoder)."""
+        asr, _ = _simulstreaming().simul_asr_factory(
+            self._build_args(model_name, beams)
         )
+        logger.info(f"SimulWhisper model loaded: model={model_name}, beams={beams}")
+        return asr
+
+    def _tune(self, asr):
+        """Apply the chunking parameters to a loaded ASR's decoding config."""
+        cfg = getattr(getattr(asr, "model", None), "cfg", None)
+        if cfg is not None:
+            cfg.frame_threshold = self.frame_threshold
+            cfg.segment_length = self.min_chunk_size
+            # Read into the decoder context by the online processor's init()
+            cfg.init_prompt = self._context
 
-        self.asr, self.online_processor = simul_asr_factory(args)
+    def _init_processor(self):
+        """Initialize the SimulWhisper online processor (lazy loading)."""
+        if self._initialized:
+            return
+
+        SimulWhisperOnline = _simulstreaming().SimulWhisperOnline
+
+        key = (self.model_name, self.beams)
+        if key not in self._asrs:
+            self._asrs[key] = _model_loader.submit(self._load_asr, *key).result()
+        self.asr = self._asrs[key]
+        self._tune(self.asr)
+        # The online processor is cheap; only the ASR holds model weights
+        self.online_processor = SimulWhisperOnline(self.asr)
         self._initialized = True
         logger.info(
             f"SimulWhisper initialized: model={self.model_name}, "
-            f"language={self.language}, coreml={self.use_coreml}"
+            f"language={self.language}, coreml={self.use_coreml}, "
+            f"beams={self.beams}, frame_threshold={self.frame_threshold}, "
+            f"min_chunk_size={self.min_chunk_size}"
         )
 
+    def apply_tier(self, tier):
+        """Adopt a governor tier; only the online processor is rebuilt lazily.
+
+        A model this session has not loaded yet is loaded in the background;
+        the session keeps its current model until the load is done.
+        """
+        model = (tier.model or self.base_model, tier.beams)
+        if self._pending and self._pending[1].done():
+            key, future = self._pending
+            self._pending = None
+            try:
+                self._asrs[key] = future.result()
+            except Exception as e:
+                _failed_models.add(key)
+                logger.error(f"SimulWhisper model {key[0]} failed to load: {e}")
+        if model not in self._asrs and self._asrs:
+            if self._pending is None and model not in _failed_models:
+                self._pending = (model, _model_loader.submit(self._load_asr, *model))
+            model = (self.model_name, self.beams)
+
+        settings = (*model, tier.frame_threshold, tier.min_chunk_size)
+        current = (
+            self.model_name,
+            self.beams,
+            self.frame_threshold,
+            self.min_chunk_size,
+        )
+        if settings == current:
+            return
+        (
+            self.model_name,
+            self.beams,
+            self.frame_threshold,
+            self.min_chunk_size,
+        ) = settings
+        self.online_processor = None
+        self._initialized = False
+
+    def restore_context(self, text: str):
+        """Seed the decoding prompt with text confirmed before a reconnect."""
+        self._context = " ".join(text.split()[-self.prompt_words :]) or None
+        if self.online_processor:
+            self._tune(self.asr)
+            self.online_processor.init()
+        # Otherwise _init_processor applies it
+
     def reset(self):
         """Reset for new transcription session."""
+        self._pcm.clear()
+        self._context = None
+        if self.governor:
+            self.governor.apply(self)
         if self.online_processor:
             try:
                 self.online_processor.finish()
             except Exception:
                 pass
+            self._tune(self.asr)
             self.online_processor.init()
-        else:
-            self._init_processor()
+        # Otherwise it is (re)built by the next feed_audio, off the event loop
 
     def feed_audio(self, audio_data: bytes) -> Optional[str]:
         """
@@ -106,14 +253,17 @@ class SimulWhisperService:
         if not self._initialized:
             self._init_processor()
 
-        # Convert int16 PCM to float32 normalized [-1, 1]
-        audio_np = (
-            np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-        )
+        # Convert int16 PCM to float32 normalized [-1, 1] in the preallocated
+        # ring; the processor gets a view, which it consumes long before the
+        # ring wraps around
+        audio_np = self._pcm.write(audio_data)
+        self._pcm.clear()
 
         # Insert chunk and process
+        started = time.perf_counter()
         self.online_processor.insert_audio_chunk(audio_np)
         result = self.online_processor.process_iter()
+        _observe_rtf("SimulWhisperService", started, len(audio_np), self.governor)
 
         if result and result[2]:  # (start_time, end_time, text)
             text = result[2].strip()
@@ -143,48 +293,185 @@ class SimulWhisperService:
 class WhisperFallbackService:
     """Fallback service using original openai-whisper with buffering."""
 
-    def __init__(self):
-        from whisper_service import WhisperService
-
-        self._service = WhisperService()
-        self.buffer = bytearray()
-        self.threshold = int(2.5 * 16000 * 2)  # 2.5 seconds of 16kHz int16
+    def __init__(self, service=None, scheduler=None):
+        if service is None:
+            from whisper_service import WhisperService
+
+            service = WhisperService()
+
+        # The WhisperService (model weights) may be shared between sessions;
+        # the buffer below is per-session streaming state.
+        self._service = service
+        self._base_service = service
+        # Optional ASRGovernor adjusting window and model between utterances
+        self.governor = None
+        # Optional BatchInferenceScheduler shared across sessions
+        self._scheduler = scheduler
+        # Preallocated float32 ring; windows are handed to the model as views
+        self.buffer = PCMRingBuffer()
+        self.threshold = int(2.5 * SAMPLE_RATE)  # 2.5 seconds of samples
+
+        # Incremental streaming mode: overlapping windows over the uncommitted
+        # tail, committing words once two consecutive decodes agree on them
+        # (local agreement). The buffer then only holds uncommitted audio.
+        self.streaming = os.getenv("WHISPER_STREAMING", "false").lower() == "true"
+        self.step_samples = int(
+            float(os.getenv("WHISPER_STREAM_STEP", "1.0")) * SAMPLE_RATE
+        )
+        self.max_window_samples = min(
+            int(float(os.getenv("WHISPER_STREAM_MAX_WINDOW", "15.0")) * SAMPLE_RATE),
+            self.buffer.capacity // 2,
+        )
+        self.prompt_words = 30
+        self.partial = ""
+        self._pending_samples = 0
+        self._hypothesis: list[str] = []
+        self._committed_words: list[str] = []
+        _fallback_sessions.add(self)
+
+    def apply_tier(self, tier):
+        """Adopt a governor tier: window length and (once loaded) model."""
+        self.threshold = int(tier.fallback_window * SAMPLE_RATE)
+        self._service = self.governor.fallback_service(self._base_service)
+
+    def restore_context(self, text: str):
+        """Seed the decoding prompt with text confirmed before a reconnect."""
+        self._committed_words = text.split()[-self.prompt_words :]
 
     def reset(self):
         """Reset buffer for new session."""
+        if self.governor:
+            self.governor.apply(self)
+        self.buffer.clear()
+        self.partial = ""
+        self._pending_samples = 0
+        self._hypothesis = []
+        self._committed_words = []
+
+    def _decode_tail(self) -> list[tuple[float, float, str]]:
+        """Decode the uncommitted audio, prompted with recently committed text."""
+        prompt = " ".join(self._committed_words[-self.prompt_words :]) or None
+        started = time.perf_counter()
+        words = self._service.transcribe_words(self.buffer.view(), prompt=prompt)
+        _observe_rtf(
+            "WhisperFallbackService", started, len(self.buffer), self.governor
+        )
+        return words
+
+    def _transcribe(self, audio: np.ndarray) -> str:
+        started = time.perf_counter()
+        text = self._service.transcribe(audio)
+        _observe_rtf("WhisperFallbackService", started, len(audio), self.governor)
+        return text
+
+    def _commit(self, words: list[tuple[float, float, str]]) -> Optional[str]:
+        """Drop the audio behind the committed words and return their text."""
+        if not words:
+            return None
+        self.buffer.consume(int(words[-1][1] * SAMPLE_RATE))
+        texts = [word for _, _, word in words]
+        self._committed_words.extend(texts)
+        return " ".join(texts)
+
+    def _feed_streaming(self, audio_data: bytes) -> Optional[str]:
+        """Re-decode the uncommitted tail every step and commit agreed words."""
+        self._pending_samples += len(self.buffer.write(audio_data))
+        if self._pending_samples < self.step_samples:
+            return None
+        self._pending_samples = 0
+
+        words = self._decode_tail()
+        n = _agreed_prefix(self._hypothesis, words)
+        window_full = len(self.buffer) >= self.max_window_samples
+        if window_full and n == 0 and words:
+            # No agreement within the max window: commit all but the last word
+            n = max(1, len(words) - 1)
+
+        self._hypothesis = [word for _, _, word in words[n:]]
+        self.partial = " ".join(self._hypothesis)
+        text = self._commit(words[:n])
+
+        if window_full and not words:
+            # Long silence: keep only the most recent step of audio
+            self.buffer.consume(len(self.buffer) - self.step_samples)
+        return text
+
+    def _finish_streaming(self) -> Optional[str]:
+        """Commit whatever the final decode of the tail produces."""
+        words = self._decode_tail() if len(self.buffer) else []
+        text = " ".join(word for _, _, word in words) or None
+        self.reset()
+        return text
+
+    def _take_window(self, force: bool = False) -> Optional[np.ndarray]:
+        """Pop the buffered audio once the threshold is reached (or forced).
+
+        The returned view stays valid until the ring wraps around, which is
+        far beyond the next window since this session feeds sequentially.
+        """
+        size = len(self.buffer)
+        if not size or (not force and size < self.threshold):
+            return None
+        audio = self.buffer.view()
         self.buffer.clear()
+        return audio
 
     def feed_audio(self, audio_data: bytes) -> Optional[str]:
         """Buffer audio and transcribe when threshold reached."""
-        self.buffer.extend(audio_data)
-        if len(self.buffer) >= self.threshold:
-            audio = bytes(self.buffer)
-            self.buffer.clear()
-            return self._service.transcribe(audio)
+        if self.streaming:
+            return self._feed_streaming(audio_data)
+
+        self.buffer.write(audio_data)
+        audio = self._take_window()
+        if audio is not None:
+            return self._transcribe(audio)
         return None
 
     def finish(self) -> Optional[str]:
         """Transcribe remaining buffer."""
-        if self.buffer:
-            audio = bytes(self.buffer)
-            self.buffer.clear()
-            return self._service.transcribe(audio)
+        if self.streaming:
+            return self._finish_streaming()
+
+        audio = self._take_window(force=True)
+        if audio is not None:
+            return self._transcribe(audio)
         return None
 
     async def feed_audio_async(self, audio_data: bytes) -> Optional[str]:
-        """Async version of feed_audio."""
-        return await asyncio.to_thread(self.feed_audio, audio_data)
+        """Async version of feed_audio (batched across sessions if scheduled)."""
+        # Streaming mode needs word timestamps, which batched decoding lacks
+        if self._scheduler is None or self.streaming:
+            return await asyncio.to_thread(self.feed_audio, audio_data)
+
+        self.buffer.write(audio_data)
+        audio = self._take_window()
+        if audio is not None:
+            return await self._scheduler.submit(audio)
+        return None
 
     async def finish_async(self) -> Optional[str]:
         """Async version of finish."""
-        return await asyncio.to_thread(self.finish)
+        if self._scheduler is None or self.streaming:
+            return await asyncio.to_thread(self.finish)
+
+        audio = self._take_window(force=True)
+        if audio is not None:
+            return await self._scheduler.submit(audio)
+        return None
 
 
-def create_whisper_service():
-    """Factory function to create appropriate whisper service."""
-    force_fallback = os.getenv("FORCE_FALLBACK", "false").lower() == "true"
+def create_whisper_service(kind: Optional[str] = None):
+    """Factory function to create appropriate whisper service.
 
-    if IS_APPLE_SILICON and not force_fallback:
+    ``kind`` ("simulwhisper" or "fallback") overrides the platform choice.
+    """
+    if kind is None:
+        force_fallback = os.getenv("FORCE_FALLBACK", "false").lower() == "true"
+        use_simul = IS_APPLE_SILICON and not force_fallback
+    else:
+        use_simul = kind == "simulwhisper"
+
+    if use_simul:
         try:
             service = SimulWhisperService()
             service._init_processor()
@@ -197,5 +484,155 @@ def create_whisper_service():
     return WhisperFallbackService()
 
 
-# Global singleton instance
-whisper_service = create_whisper_service()
+class SessionLimitExceeded(RuntimeError):
+    """Raised when the pool has no free transcription session."""
+
+
+class TranscriptionSessionPool:
+    """
+    Hands out per-connection transcription sessions.
+
+    Each session owns its streaming state (the SimulWhisper online processor
+    or the fallback buffer), so concurrent connections no longer overwrite
+    each other. Fallback sessions share one loaded WhisperService model.
+    SimulWhisper keeps its decoder state inside the ASR object, so each
+    SimulWhisper session owns one, i.e. its own copy of the model weights
+    (plus the governor's light model once a session has used that tier).
+    Memory therefore grows with every session, and SimulWhisper pools are
+    capped at ``SIMULWHISPER_MAX_SESSIONS`` on top of ``max_sessions``.
+    Released sessions are kept warm and reused.
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None, kind: Optional[str] = None):
+        if max_sessions is None:
+            max_sessions = int(os.getenv("MAX_TRANSCRIPTION_SESSIONS", "4"))
+        self.max_sessions = max_sessions
+        # Service kind for create_whisper_service (None: by platform)
+        self.kind = kind
+        self._in_use = 0
+        self._idle: list = []
+        # The model is loaded lazily (warm_up or first acquire), off the loop
+        self._prototype = None
+        self._load_lock = asyncio.Lock()
+        self.scheduler = None
+        # Optional load-aware quality governor shared by all sessions
+        self.governor = create_governor()
+
+    @property
+    def ready(self) -> bool:
+        return self._prototype is not None
+
+    def _load(self):
+        prototype = create_whisper_service(self.kind)
+        if isinstance(prototype, WhisperFallbackService):
+            prototype._service.load()
+        return prototype
+
+    async def warm_up(self):
+        """Load the shared model in a worker thread (idempotent)."""
+        async with self._load_lock:
+            if self._prototype is not None:
+                return
+            prototype = await asyncio.to_thread(self._load)
+            prototype.governor = self.governor
+            if isinstance(prototype, SimulWhisperService):
+                # Every SimulWhisper session loads its own model copy
+                cap = int(os.getenv("SIMULWHISPER_MAX_SESSIONS", "2"))
+                if cap < self.max_sessions:
+                    logger.info(
+                        f"SimulWhisper: {cap} sessions (one model copy each) "
+                        f"instead of {self.max_sessions}"
+                    )
+                    self.max_sessions = cap
+            if self.governor and isinstance(prototype, WhisperFallbackService):
+                self.governor.register_service(prototype._service)
+
+            # Batch fallback decodes from all sessions into shared model calls
+            if isinstance(prototype, WhisperFallbackService) and (
+                os.getenv("WHISPER_BATCHING", "true").lower() == "true"
+            ):
+                base_service = prototype._service
+                governor = self.governor
+
+                def transcribe_batch(batch: list) -> list[str]:
+                    # The governor's tier picks the model for the whole batch
+                    service = (
+                        governor.fallback_service(base_service)
+                        if governor
+                        else base_service
+                    )
+                    started = time.perf_counter()
+                    texts = service.transcribe_batch(batch)
+                    _observe_rtf(
+                        "WhisperFallbackService",
+                        started,
+                        sum(len(audio) for audio in batch),
+                        governor,
+                    )
+                    return texts
+
+                self.scheduler = BatchInferenceScheduler(transcribe_batch)
+                prototype._scheduler = self.scheduler
+            self._prototype = prototype
+            self._idle.append(prototype)
+
+    @property
+    def active_sessions(self) -> int:
+        return self._in_use
+
+    def _new_session(self):
+        if isinstance(self._prototype, SimulWhisperService):
+            session = SimulWhisperService()
+            session.governor = self.governor
+            if self.governor:
+                session.apply_tier(self.governor.tier)
+            session._init_processor()
+            return session
+        session = WhisperFallbackService(
+            service=self._prototype._base_service, scheduler=self.scheduler
+        )
+        session.governor = self.governor
+        return session
+
+    async def acquire(self):
+        """Get a fresh session for a new connection."""
+        if self._in_use >= self.max_sessions:
+            raise SessionLimitExceeded(
+                f"All {self.max_sessions} transcription sessions are in use"
+            )
+        # Reserve the slot before awaiting so concurrent connects can't overshoot
+        self._in_use += 1
+        try:
+            await self.warm_up()
+            if self._idle:
+                session = self._idle.pop()
+            else:
+                session = await asyncio.to_thread(self._new_session)
+            session.reset()
+        except Exception:
+            self._in_use -= 1
+            raise
+        logger.info(
+            f"Transcription session acquired ({self._in_use}/{self.max_sessions})"
+        )
+        return session
+
+    def release(self, session):
+        """Return a session to the pool once its connection is closed."""
+        self._in_use -= 1
+        session.reset()
+        self._idle.append(session)
+        logger.info(
+            f"Transcription session released ({self._in_use}/{self.max_sessions})"
+        )
+
+    async def close(self):
+        """Stop the batch scheduler's worker (app shutdown)."""
+        if self.scheduler is not None:
+            logger.info(f"Whisper batch stats: {self.scheduler.stats()}")
+            await self.scheduler.stop()
+
+
+# Global session pool (one shared model, per-connection streaming state).
+# Creating it is cheap; the model loads on warm_up() or the first connection.
+session_pool = TranscriptionSessionPool()
@@ -0,0 +1,126 @@
+"""
+Speculative point extraction while the user is still speaking.
+
+Once enough new confirmed text has built up, point generation starts in the
+background on the transcript so far. When the pause arrives and the final
+transcript has not drifted much from the speculated one, its chunks (already
+generated or still streaming) are replayed instead of starting a new LLM
+call, so the pause-to-point latency no longer includes a full round-trip.
+Stale speculations are cancelled whenever a newer one starts.
+"""
+
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Callable, Optional
+
+from llm_service import ERROR_MESSAGE, extract_point_stream
+
+logger = logging.getLogger(__name__)
+
+
+class _Speculation:
+    def __init__(self, source: str):
+        self.source = source
+        self.chunks: list[str] = []
+        self.done = False
+        self.updated = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    async def replay(self) -> AsyncIterator[str]:
+        """Chunks generated so far, then the rest as they stream in."""
+        logger.info("Reusing speculative point extraction")
+        sent = 0
+        try:
+            while True:
+                self.updated.clear()
+                while sent < len(self.chunks):
+                    yield self.chunks[sent]
+                    sent += 1
+                if self.done:
+                    return
+                await self.updated.wait()
+        finally:
+            self.cancel()
+
+    def cancel(self):
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+
+class SpeculativePointExtractor:
+    """Per-connection background point generation on the confirmed transcript."""
+
+    def __init__(
+        self,
+        min_new_chars: Optional[int] = None,
+        max_drift: Optional[float] = None,
+    ):
+        if min_new_chars is None:
+            min_new_chars = int(os.getenv("SPECULATIVE_MIN_CHARS", "40"))
+        if max_drift is None:
+            max_drift = float(os.getenv("SPECULATIVE_MAX_DRIFT", "0.15"))
+        self.min_new_chars = min_new_chars
+        self.max_drift = max_drift
+        self._pending_chars = 0
+        self._current: Optional[_Speculation] = None
+
+    def observe(self, new_chars: int, get_transcript: Callable[[], str]):
+        """Record newly confirmed text; speculate once enough has built up."""
+        self._pending_chars += new_chars
+        if self._pending_chars < self.min_new_chars:
+            return
+        self._pending_chars = 0
+        self._start(get_transcript())
+
+    def _start(self, source: str):
+        self.cancel()
+        speculation = _Speculation(source)
+        speculation.task = asyncio.create_task(self._run(speculation))
+        self._current = speculation
+
+    async def _run(self, speculation: _Speculation):
+        try:
+            async for chunk in extract_point_stream(speculation.source):
+                speculation.chunks.append(chunk)
+                speculation.updated.set()
+        finally:
+            speculation.done = True
+            speculation.updated.set()
+
+    def _reusable(self, transcript: str) -> bool:
+        speculation = self._current
+        if speculation is None or ERROR_MESSAGE in speculation.chunks:
+            return False
+        if not transcript.startswith(speculation.source):
+            return False
+        drift = (len(transcript) - len(speculation.source)) / max(len(transcript), 1)
+        return drift <= self.max_drift
+
+    def take(self, transcript: str) -> Optional[_Speculation]:
+        """At a pause: hand over the speculation if it matches the raw final
+        transcript (``replay`` it instead of a new LLM call), else drop it.
+
+        Taking it right away leaves the speculator free for the next
+        utterance while the point is still waiting its turn.
+        """
+        speculation = self._current if self._reusable(transcript) else None
+        if speculation is None:
+            self.cancel()
+        self._current = None
+        self._pending_chars = 0
+        return speculation
+
+    def cancel(self):
+        """Drop the current speculation (stale transcript, reset or disconnect)."""
+        self._pending_chars = 0
+        if self._current is not None:
+            self._current.cancel()
+            self._current = None
+
+
+def create_speculator() -> Optional[SpeculativePointExtractor]:
+    """Per-connection speculator, or None unless SPECULATIVE_POINTS is enabled."""
+    if os.getenv("SPECULATIVE_POINTS", "false").lower() != "true":
+        return None
+    return SpeculativePointExtractor()
@@ -0,0 +1,102 @@
+"""
+Deterministic stand-in for the WhisperLiveKit engine (``WHISPER_BACKEND=stub``).
+
+Lets the server and the benchmarks run offline without a model or GPU. The
+stub "transcribes" every ``STUB_ASR_CHUNK_SECONDS`` of audio into a fixed
+word, after sleeping ``rtf * chunk`` seconds plus ``STUB_ASR_LATENCY_MS``,
+so the real-time factor and fixed latency are configurable.
+``STUB_ASR_SETUP_MS`` simulates the cost of starting a processor. It exposes the
+same surface the /ws endpoint uses: ``create_tasks()``, ``process_audio()``,
+``cleanup()`` and FrontData-like results.
+"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+from typing import Optional
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+
+class StubTranscriptionEngine:
+    """Holds the simulated model settings shared by all stub processors."""
+
+    def __init__(
+        self,
+        rtf: Optional[float] = None,
+        latency_ms: Optional[float] = None,
+        chunk_seconds: Optional[float] = None,
+        setup_ms: Optional[float] = None,
+    ):
+        if rtf is None:
+            rtf = float(os.getenv("STUB_ASR_RTF", "0.1"))
+        if latency_ms is None:
+            latency_ms = float(os.getenv("STUB_ASR_LATENCY_MS", "20"))
+        if chunk_seconds is None:
+            chunk_seconds = float(os.getenv("STUB_ASR_CHUNK_SECONDS", "1.0"))
+        if setup_ms is None:
+            setup_ms = float(os.getenv("STUB_ASR_SETUP_MS", "0"))
+        self.rtf = rtf
+        self.latency = latency_ms / 1000.0
+        self.chunk_bytes = int(chunk_seconds * SAMPLE_RATE) * 2
+        self.setup = setup_ms / 1000.0
+        # Serialize "inference" like a single model instance would
+        self.lock = asyncio.Lock()
+
+    @property
+    def audio_processor_class(self):
+        return StubAudioProcessor
+
+
+class StubAudioProcessor:
+    """AudioProcessor look-alike that emits one word per audio chunk."""
+
+    def __init__(self, transcription_engine: StubTranscriptionEngine, **kwargs):
+        self.engine = transcription_engine
+        self._audio: asyncio.Queue = asyncio.Queue()
+        self._pending = bytearray()
+        self._lines: list[SimpleNamespace] = []
+        self._offset = 0.0
+
+    async def create_tasks(self):
+        if self.engine.setup:
+            await asyncio.sleep(self.engine.setup)
+        return self._results()
+
+    async def process_audio(self, audio: Optional[bytes]):
+        # Empty audio signals end-of-stream, as with AudioProcessor
+        self._audio.put_nowait(audio or None)
+
+    async def cleanup(self):
+        self._audio.put_nowait(None)
+
+    async def _transcribe(self, chunk: bytes) -> SimpleNamespace:
+        duration = len(chunk) / BYTES_PER_SECOND
+        async with self.engine.lock:
+            await asyncio.sleep(self.engine.latency + self.engine.rtf * duration)
+        line = SimpleNamespace(
+            text=f"단어{len(self._lines) + 1}",
+            start=self._offset,
+            end=self._offset + duration,
+        )
+        self._offset += duration
+        self._lines.append(line)
+        return SimpleNamespace(lines=list(self._lines), buffer_transcription="")
+
+    async def _results(self):
+        chunk_bytes = self.engine.chunk_bytes
+        while True:
+            audio = await self._audio.get()
+            if audio is None:
+                break
+            self._pending += audio
+            while len(self._pending) >= chunk_bytes:
+                chunk = bytes(self._pending[:chunk_bytes])
+                del self._pending[:chunk_bytes]
+                yield await self._transcribe(chunk)
+
+        # End of stream: flush the remainder as a final line
+        if self._pending:
+            yield await self._transcribe(bytes(self._pending))
+            self._pending.clear()
@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from audio_codecs import FRAME_HEADER, IngestDecoder
+
+
+def framed(seq, payload, timestamp_ms=0):
+    return FRAME_HEADER.pack(seq, timestamp_ms) + payload
+
+
+class IngestDecoderTest(unittest.TestCase):
+    def test_plain_pcm_needs_no_decoder(self):
+        config = {"codec": "pcm16", "sample_rate": 16000, "framed": False}
+        self.assertIsNone(IngestDecoder.from_config(config))
+
+    def test_unsupported_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            IngestDecoder("mp3")
+        with self.assertRaises(ValueError):
+            IngestDecoder("mulaw", sample_rate=44100)
+
+    def test_g711_is_decoded_and_upsampled(self):
+        decoder = IngestDecoder("mulaw", sample_rate=8000, framed=False)
+        pcm = np.frombuffer(decoder.decode(bytes([0xFF, 0x00])), dtype=np.int16)
+        self.assertEqual(len(pcm), 4)
+        self.assertEqual(pcm[0], 0)
+        self.assertEqual(pcm[-1], -32124)
+
+        decoder = IngestDecoder("alaw", sample_rate=16000, framed=False)
+        pcm = np.frombuffer(decoder.decode(bytes([0xD5, 0x55])), dtype=np.int16)
+        self.assertEqual(list(pcm), [8, -8])
+
+    def test_sequence_gaps_and_late_frames_are_counted(self):
+        decoder = IngestDecoder("pcm16")
+        payload = np.arange(4, dtype=np.int16).tobytes()
+        self.assertEqual(decoder.decode(framed(0, payload)), payload)
+        self.assertEqual(decoder.decode(framed(3, payload, 60)), payload)
+        # Arrives after frame 3: dropped
+        self.assertEqual(decoder.decode(framed(2, payload)), b"")
+
+        self.assertEqual(decoder.frames_dropped, 2)
+        self.assertEqual(decoder.frames_out_of_order, 1)
+        self.assertEqual(decoder.last_timestamp_ms, 60)
+
+    def test_sequence_number_wraps_around(self):
+        decoder = IngestDecoder("pcm16")
+        decoder.decode(framed(0xFFFFFFFF, b""))
+        decoder.decode(framed(0, b""))
+        self.assertEqual(decoder.frames_dropped, 0)
+
+    def test_frame_shorter_than_the_header_is_an_error(self):
+        with self.assertRaises(ValueError):
+            IngestDecoder("pcm16").decode(b"\x00")
+
+
+if __name__ == "__main__":
+    unittest.main()
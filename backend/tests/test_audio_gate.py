@@ -0,0 +1,52 @@
+import unittest
+
+import numpy as np
+
+from audio_gate import EnergyVADGate
+
+FRAME = 480  # 30 ms at 16 kHz
+
+
+def frames(silent, loud=0, after=0):
+    samples = np.concatenate(
+        (
+            np.zeros(silent * FRAME, dtype=np.int16),
+            np.full(loud * FRAME, 8000, dtype=np.int16),
+            np.zeros(after * FRAME, dtype=np.int16),
+        )
+    )
+    return samples.tobytes()
+
+
+def frame_count(pcm):
+    return len(pcm) // 2 // FRAME
+
+
+class EnergyVADGateTest(unittest.TestCase):
+    def setUp(self):
+        # 5 frames of pre-roll, 10 frames of hangover
+        self.gate = EnergyVADGate(threshold_db=-45, hangover_ms=300, preroll_ms=150)
+
+    def test_silence_is_dropped(self):
+        self.assertEqual(self.gate.process(frames(20)), b"")
+        self.assertEqual(self.gate.samples_skipped, 20 * FRAME)
+
+    def test_speech_keeps_preroll_and_hangover(self):
+        out = self.gate.process(frames(20, loud=5, after=20))
+        self.assertEqual(frame_count(out), 5 + 5 + 10)
+        self.assertEqual(self.gate.samples_skipped, 25 * FRAME)
+
+    def test_preroll_is_replayed_from_the_previous_call(self):
+        self.gate.process(frames(20))
+        out = self.gate.process(frames(0, loud=3))
+        self.assertEqual(frame_count(out), 5 + 3)
+        self.assertEqual(self.gate.samples_skipped, 15 * FRAME)
+
+    def test_partial_frames_carry_over(self):
+        pcm = frames(0, loud=2)
+        self.assertEqual(self.gate.process(pcm[:FRAME]), b"")
+        self.assertEqual(frame_count(self.gate.process(pcm[FRAME:])), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import asyncio
+import unittest
+
+from ingest import BYTES_PER_SECOND, IngestQueue
+
+
+class IngestQueueTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.consumed = []
+        self.notified = []
+
+    async def consume(self, audio):
+        self.consumed.append(audio)
+
+    async def notify(self, message):
+        self.notified.append(message["active"])
+
+    def queue(self, policy, max_frames=2, max_seconds=10.0):
+        queue = IngestQueue(
+            self.consume,
+            backend="test",
+            notify=self.notify,
+            max_frames=max_frames,
+            max_seconds=max_seconds,
+            policy=policy,
+        )
+        self.addAsyncCleanup(queue.close)
+        return queue
+
+    async def put_all(self, queue, frames):
+        for frame in frames:
+            await queue.put(frame, 0.0)
+
+    async def test_coalesce_appends_to_the_last_frame_when_full(self):
+        queue = self.queue("coalesce")
+        await self.put_all(queue, [b"a", b"b", b"c", b"d"])
+        self.assertEqual(queue.queue_depth, 2)
+        self.assertEqual(queue.coalesced, 2)
+
+        queue.start()
+        await queue.drain()
+        self.assertEqual(self.consumed, [b"a", b"bcd"])
+
+    async def test_coalesce_drops_the_oldest_audio_past_the_limit(self):
+        frame = b"\x00" * BYTES_PER_SECOND
+        queue = self.queue("coalesce", max_frames=8, max_seconds=2.0)
+        await self.put_all(queue, [b"\x01" * BYTES_PER_SECOND, frame, frame])
+
+        queue.start()
+        await queue.drain()
+        self.assertEqual(self.consumed, [frame, frame])
+        self.assertEqual(queue.stats()["dropped_seconds"], 1.0)
+
+    async def test_drop_oldest_discards_the_oldest_frames(self):
+        queue = self.queue("drop-oldest")
+        await self.put_all(queue, [b"a", b"b", b"c"])
+
+        queue.start()
+        await queue.drain()
+        self.assertEqual(self.consumed, [b"b", b"c"])
+        self.assertEqual(queue.dropped_bytes, 1)
+
+    async def test_backpressure_waits_for_room_and_signals_the_client(self):
+        queue = self.queue("backpressure", max_frames=1)
+        await queue.put(b"a", 0.0)
+        blocked = asyncio.create_task(queue.put(b"b", 0.0))
+        await asyncio.sleep(0)
+        self.assertFalse(blocked.done())
+        self.assertEqual(self.notified, [True])
+
+        queue.start()
+        await blocked
+        await queue.drain()
+        self.assertEqual(self.consumed, [b"a", b"b"])
+        self.assertEqual(self.notified, [True, False])
+        self.assertEqual(queue.slowdowns, 1)
+
+    async def test_consumer_error_is_raised_to_the_producer(self):
+        async def fail(audio):
+            raise RuntimeError("asr gone")
+
+        queue = IngestQueue(fail, backend="test", policy="coalesce")
+        self.addAsyncCleanup(queue.close)
+        queue.start()
+        await queue.put(b"a", 0.0)
+        with self.assertRaises(RuntimeError):
+            await queue.drain()
+        with self.assertRaises(RuntimeError):
+            await queue.put(b"b", 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import unittest
+
+from llm_scheduler import LLMScheduler, llm_session
+
+
+class LLMSchedulerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.scheduler = LLMScheduler(max_in_flight=1, deadline_seconds=5.0)
+        self.served = []
+
+    async def request(self, session, name, hold=None):
+        llm_session.set(session)
+        async with self.scheduler.slot():
+            self.served.append(name)
+            if hold is not None:
+                await hold.wait()
+
+    async def test_waiting_sessions_are_served_round_robin(self):
+        hold = asyncio.Event()
+        first = asyncio.create_task(self.request("a", "a0", hold))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(self.request(session, name))
+            for session, name in (("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"))
+        ]
+        await asyncio.sleep(0)
+        self.assertEqual(self.scheduler.queue_depth, 4)
+
+        hold.set()
+        await asyncio.gather(first, *queued)
+
+        self.assertEqual(self.served, ["a0", "a1", "b1", "a2", "a3"])
+        self.assertEqual(self.scheduler.in_flight, 0)
+
+    async def test_in_flight_requests_are_bounded(self):
+        self.scheduler = LLMScheduler(max_in_flight=2, deadline_seconds=5.0)
+        hold = asyncio.Event()
+        tasks = [
+            asyncio.create_task(self.request(i, f"r{i}", hold)) for i in range(5)
+        ]
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.scheduler.in_flight, 2)
+        self.assertEqual(self.scheduler.queue_depth, 3)
+        hold.set()
+        await asyncio.gather(*tasks)
+        self.assertEqual(len(self.served), 5)
+        self.assertEqual(self.scheduler.in_flight, 0)
+
+    async def test_deadline_covers_the_queue_wait(self):
+        self.scheduler = LLMScheduler(max_in_flight=1, deadline_seconds=0.05)
+        hold = asyncio.Event()
+        running = asyncio.create_task(self.request("a", "running", hold))
+        await asyncio.sleep(0)
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.request("b", "late")
+        self.assertEqual(self.scheduler.queue_depth, 0)
+
+        hold.set()
+        await running
+        self.assertEqual(self.served, ["running"])
+        self.assertEqual(self.scheduler.in_flight, 0)
+
+    async def test_cancel_session_drops_its_queued_requests(self):
+        hold = asyncio.Event()
+        running = asyncio.create_task(self.request("x", "running", hold))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(self.request("x", "queued"))
+        await asyncio.sleep(0)
+
+        self.scheduler.cancel_session("x")
+        await asyncio.gather(running, queued, return_exceptions=True)
+
+        self.assertEqual(self.served, ["running"])
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(self.scheduler.in_flight, 0)
+        self.assertEqual(self.scheduler.queue_depth, 0)
+
+    async def test_cancel_after_grant_does_not_run_the_request(self):
+        llm_session.set("y")
+        async with self.scheduler.slot():
+            queued = asyncio.create_task(self.request("x", "queued"))
+            await asyncio.sleep(0)
+        # The slot has passed to the queued request, which is cancelled
+        # before it gets to run
+        self.scheduler.cancel_session("x")
+        await asyncio.gather(queued, return_exceptions=True)
+
+        self.assertEqual(self.served, [])
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(self.scheduler.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import json
+import unittest
+
+from outbound import OutboundSender
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_text(self, text):
+        self.frames.append(json.loads(text))
+
+
+class OutboundSenderTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.websocket = FakeWebSocket()
+
+    def sender(self, **kwargs):
+        sender = OutboundSender(self.websocket, **kwargs)
+        self.addAsyncCleanup(sender.close)
+        return sender
+
+    async def flush(self, sender):
+        sender.start()
+        while sender.queue_depth:
+            await asyncio.sleep(0.01)
+
+    async def test_point_chunks_are_merged_into_one_frame(self):
+        sender = self.sender(batch_interval_ms=0)
+        for text in ("핵심", "은 ", "일정"):
+            await sender.send({"type": "point_chunk", "text": text})
+        await sender.send({"type": "point_complete", "point": "핵심은 일정"})
+        await self.flush(sender)
+
+        self.assertEqual(
+            self.websocket.frames,
+            [
+                {"type": "point_chunk", "text": "핵심은 일정"},
+                {"type": "point_complete", "point": "핵심은 일정"},
+            ],
+        )
+        self.assertEqual(sender.coalesced, 2)
+
+    async def test_queued_partial_is_replaced_but_final_text_is_kept(self):
+        sender = self.sender()
+        for text, partial in (("a", True), ("ab", True), ("abc", False)):
+            await sender.send({"type": "transcript", "text": text, "partial": partial})
+        await sender.send({"type": "transcript", "text": "d", "partial": True})
+        await self.flush(sender)
+
+        self.assertEqual(
+            [(m["text"], m["partial"]) for m in self.websocket.frames],
+            [("ab", True), ("abc", False), ("d", True)],
+        )
+
+    async def test_full_queue_makes_the_producer_wait(self):
+        sender = self.sender(max_queue=1)
+        await sender.send({"type": "session", "session_id": "s"})
+        blocked = asyncio.create_task(sender.send({"type": "config_ack"}))
+        await asyncio.sleep(0)
+        self.assertFalse(blocked.done())
+
+        sender.start()
+        await blocked
+        await self.flush(sender)
+        types = [message["type"] for message in self.websocket.frames]
+        self.assertEqual(types, ["session", "config_ack"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from pcm_buffer import SAMPLE_RATE, PCMRingBuffer
+
+
+def pcm(values):
+    return np.asarray(values, dtype=np.int16).tobytes()
+
+
+def scaled(values):
+    return np.asarray(values, dtype=np.float32) / 32768.0
+
+
+class PCMRingBufferTest(unittest.TestCase):
+    def setUp(self):
+        # 16 samples
+        self.ring = PCMRingBuffer(capacity_seconds=16 / SAMPLE_RATE)
+
+    def test_write_returns_the_converted_samples(self):
+        view = self.ring.write(pcm([0, 16384, -32768]))
+        np.testing.assert_array_equal(view, scaled([0, 16384, -32768]))
+        self.assertEqual(len(self.ring), 3)
+
+    def test_window_across_the_wraparound_is_one_contiguous_view(self):
+        self.ring.write(pcm(range(12)))
+        self.ring.consume(12)
+        view = self.ring.write(pcm(range(100, 110)))
+
+        np.testing.assert_array_equal(view, scaled(range(100, 110)))
+        np.testing.assert_array_equal(self.ring.view(), scaled(range(100, 110)))
+        self.assertTrue(self.ring.view().flags["C_CONTIGUOUS"])
+        self.assertEqual(self.ring.overflow_samples, 0)
+
+    def test_overflow_drops_the_oldest_samples(self):
+        self.ring.write(pcm(range(10)))
+        self.ring.write(pcm(range(10, 20)))
+
+        self.assertEqual(len(self.ring), 16)
+        self.assertEqual(self.ring.overflow_samples, 4)
+        np.testing.assert_array_equal(self.ring.view(), scaled(range(4, 20)))
+
+    def test_frame_larger_than_the_ring_keeps_its_tail(self):
+        self.ring.write(pcm(range(20)))
+        np.testing.assert_array_equal(self.ring.view(), scaled(range(4, 20)))
+
+    def test_view_and_consume_take_the_oldest_samples(self):
+        self.ring.write(pcm(range(8)))
+        np.testing.assert_array_equal(self.ring.view(3), scaled(range(3)))
+        self.ring.consume(3)
+        np.testing.assert_array_equal(self.ring.view(), scaled(range(3, 8)))
+        self.ring.clear()
+        self.assertEqual(len(self.ring), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
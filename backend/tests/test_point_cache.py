@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from point_cache import PointCache
+
+
+class PointCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "points.db")
+
+    async def test_database_is_opened_on_first_use(self):
+        cache = PointCache(max_entries=4, ttl=60, path=self.path)
+        self.addCleanup(cache.close)
+        self.assertFalse(os.path.exists(self.path))
+
+        await cache.put("key", ["a", "b"])
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(await cache.get("key"), ["a", "b"])
+
+    async def test_entries_survive_a_restart(self):
+        cache = PointCache(max_entries=4, ttl=60, path=self.path)
+        await cache.put("key", ["point"])
+        cache.close()
+
+        restarted = PointCache(max_entries=4, ttl=60, path=self.path)
+        self.addCleanup(restarted.close)
+        self.assertEqual(await restarted.get("key"), ["point"])
+
+    async def test_database_keeps_only_the_newest_entries(self):
+        cache = PointCache(max_entries=2, ttl=60, path=self.path, db_max_entries=3)
+        for i in range(6):
+            await cache.put(f"k{i}", [f"p{i}"])
+        cache.close()
+
+        with sqlite3.connect(self.path) as db:
+            keys = [row[0] for row in db.execute("SELECT key FROM points")]
+        self.assertEqual(sorted(keys), ["k3", "k4", "k5"])
+
+    async def test_expired_entry_is_a_miss(self):
+        cache = PointCache(max_entries=4, ttl=-1)
+        await cache.put("key", ["point"])
+        self.assertIsNone(await cache.get("key"))
+        self.assertEqual(cache.misses, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+
+from session_store import SessionStore
+
+
+class SessionStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_session_resumes_after_a_restart(self):
+        store = SessionStore(self.directory.name, idle_ttl=300)
+        state, resumed = store.open(None)
+        self.assertFalse(resumed)
+        for text in ("first", "second"):
+            store.append(state, text)
+        store.detach(state)
+        store.close()
+
+        restarted = SessionStore(self.directory.name, idle_ttl=300)
+        self.addCleanup(restarted.close)
+        state, resumed = restarted.open(state.session_id)
+        self.assertTrue(resumed)
+        self.assertEqual(state.text, "first second")
+
+    def test_utterance_boundary_truncates_the_file(self):
+        store = SessionStore(self.directory.name, idle_ttl=300)
+        state, _ = store.open(None)
+        store.append(state, "before the pause")
+        store.clear(state)
+        store.detach(state)
+        store.close()
+
+        restarted = SessionStore(self.directory.name, idle_ttl=300)
+        self.addCleanup(restarted.close)
+        self.assertEqual(restarted.open(state.session_id)[0].segments, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from unittest import mock
+
+import simul_whisper_service
+from simul_whisper_service import SimulWhisperService, create_whisper_service
+
+# Minimal stand-in for the Lightning-SimulWhisper checkout
+FAKE_SIMULSTREAMING = textwrap.dedent(
+    """
+    from types import SimpleNamespace
+
+    loads = []
+
+
+    def simul_asr_factory(args):
+        loads.append((args.model_name, args.beams))
+        asr = SimpleNamespace(model=SimpleNamespace(cfg=SimpleNamespace()))
+        return asr, SimulWhisperOnline(asr)
+
+
+    class SimulWhisperOnline:
+        def __init__(self, asr):
+            self.asr = asr
+
+        def init(self):
+            pass
+
+        def insert_audio_chunk(self, audio):
+            self.audio = audio
+
+        def process_iter(self):
+            return (0.0, 1.0, " word ")
+
+        def finish(self):
+            return None
+    """
+)
+
+
+class SimulWhisperLoadTest(unittest.TestCase):
+    def setUp(self):
+        self.checkout = tempfile.TemporaryDirectory()
+        module = os.path.join(self.checkout.name, "simulstreaming_whisper.py")
+        with open(module, "w") as f:
+            f.write(FAKE_SIMULSTREAMING)
+        patch = mock.patch.object(
+            simul_whisper_service, "SIMUL_WHISPER_PATH", self.checkout.name
+        )
+        patch.start()
+        self.addCleanup(patch.stop)
+        sys.modules.pop("simulstreaming_whisper", None)
+
+    def tearDown(self):
+        sys.modules.pop("simulstreaming_whisper", None)
+        if self.checkout.name in sys.path:
+            sys.path.remove(self.checkout.name)
+        self.checkout.cleanup()
+
+    def test_simulwhisper_is_used_when_the_checkout_imports(self):
+        # The checkout is only importable once its path has been added
+        service = create_whisper_service("simulwhisper")
+        self.assertIsInstance(service, SimulWhisperService)
+        self.assertEqual(service.feed_audio(b"\x00\x00" * 1600), "word")
+
+    def test_same_model_tier_reuses_the_loaded_asr(self):
+        service = SimulWhisperService()
+        service._init_processor()
+        loads = sys.modules["simulstreaming_whisper"].loads
+        tier = mock.Mock(
+            model=None, beams=service.beams, frame_threshold=30, min_chunk_size=1.0
+        )
+        service.apply_tier(tier)
+        service.feed_audio(b"\x00\x00" * 1600)
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(service.asr.model.cfg.frame_threshold, 30)
+
+    def test_restored_text_is_the_decoding_prompt_until_reset(self):
+        service = SimulWhisperService()
+        service._init_processor()
+        service.restore_context("confirmed before the reconnect")
+        cfg = service.asr.model.cfg
+        self.assertEqual(cfg.init_prompt, "confirmed before the reconnect")
+        service.reset()
+        self.assertIsNone(cfg.init_prompt)
+
+    def test_failed_tier_model_is_not_reloaded(self):
+        service = SimulWhisperService()
+        service._init_processor()
+        tier = mock.Mock(model="tiny", beams=1, frame_threshold=30, min_chunk_size=1.0)
+        failed = mock.patch.object(
+            simul_whisper_service, "_failed_models", set()
+        )
+        failed.start()
+        self.addCleanup(failed.stop)
+        with mock.patch.object(
+            service, "_load_asr", side_effect=RuntimeError("no weights")
+        ) as load:
+            service.apply_tier(tier)
+            service._pending[1].exception()
+            for _ in range(3):
+                service.apply_tier(tier)
+        self.assertEqual(load.call_count, 1)
+        self.assertIn(("tiny", 1), simul_whisper_service._failed_models)
+
+
+if __name__ == "__main__":
+    unittest.main()
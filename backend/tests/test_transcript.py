@@ -0,0 +1,42 @@
+import unittest
+from types import SimpleNamespace
+
+from transcript import IncrementalTranscript
+
+
+def lines(*texts):
+    return [SimpleNamespace(text=text, start=None, end=None) for text in texts]
+
+
+class IncrementalTranscriptTest(unittest.TestCase):
+    def setUp(self):
+        self.transcript = IncrementalTranscript()
+
+    def test_new_and_extended_lines_yield_only_their_new_text(self):
+        self.assertEqual(self.transcript.update(lines("안녕")), ["안녕"])
+        self.assertEqual(self.transcript.update(lines("안녕 하세요")), ["하세요"])
+        self.assertEqual(
+            self.transcript.update(lines("안녕 하세요", "반갑습니다")), ["반갑습니다"]
+        )
+        self.assertEqual(self.transcript.update(lines("안녕 하세요", "반갑습니다")), [])
+        self.assertEqual(self.transcript.text(), "안녕 하세요 반갑습니다")
+
+    def test_rewritten_line_is_sent_in_full(self):
+        self.transcript.update(lines("내일 회의"))
+        self.assertEqual(self.transcript.update(lines("네일 회의")), ["네일 회의"])
+
+    def test_dropped_lines_are_re_examined(self):
+        self.transcript.update(lines("one", "two", "three"))
+        self.assertEqual(self.transcript.update(lines("one", "too")), ["too"])
+        self.assertEqual(self.transcript.text(), "one too")
+
+    def test_restored_prefix_is_part_of_the_text_but_not_re_sent(self):
+        self.transcript.restore("before the reconnect")
+        self.assertEqual(self.transcript.update(lines("after")), ["after"])
+        self.assertEqual(self.transcript.text(), "before the reconnect after")
+        self.transcript.clear()
+        self.assertEqual(self.transcript.text(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
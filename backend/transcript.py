@@ -0,0 +1,81 @@
+"""
+Incremental transcript model for WhisperLiveKit FrontData updates.
+
+Every FrontData carries the full list of lines for the utterance. Instead of
+re-joining and diffing all of them on each update, segments are stored by
+line index and only the last stored line and any new ones are examined, so
+each update costs O(new lines) rather than O(utterance length).
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class TranscriptSegment:
+    index: int
+    text: str
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+
+class IncrementalTranscript:
+    """Confirmed transcript of one utterance, kept as a list of segments."""
+
+    def __init__(self):
+        self.segments: list[TranscriptSegment] = []
+        # Text confirmed before a reconnect (resumed session), not re-sent
+        self.prefix = ""
+
+    def clear(self):
+        self.segments = []
+        self.prefix = ""
+
+    def restore(self, text: str):
+        """Continue an utterance whose earlier text was confirmed elsewhere."""
+        self.prefix = text
+
+    def update(self, lines) -> list[str]:
+        """
+        Apply a FrontData.lines snapshot.
+
+        Returns:
+            Text deltas for new or changed lines, in order
+        """
+        if len(lines) < len(self.segments):
+            # Processor dropped lines (e.g. re-segmentation); re-examine from there
+            del self.segments[len(lines) :]
+
+        deltas = []
+        # Earlier lines are final; only the last stored line can still change
+        for index in range(max(0, len(self.segments) - 1), len(lines)):
+            line = lines[index]
+            text = (line.text or "").strip()
+            start = getattr(line, "start", None)
+            end = getattr(line, "end", None)
+
+            if index == len(self.segments):
+                self.segments.append(TranscriptSegment(index, text, start, end))
+                if text:
+                    deltas.append(text)
+                continue
+
+            segment = self.segments[index]
+            segment.start, segment.end = start, end
+            if text == segment.text:
+                continue
+            if segment.text and text.startswith(segment.text):
+                delta = text[len(segment.text) :].strip()
+            else:
+                delta = text
+            segment.text = text
+            if delta:
+                deltas.append(delta)
+        return deltas
+
+    def text(self) -> str:
+        """Full transcript, joined on demand (e.g. for point extraction)."""
+        texts = [segment.text for segment in self.segments if segment.text]
+        if self.prefix:
+            texts.insert(0, self.prefix)
+        return " ".join(texts)
@@ -1,15 +1,28 @@
 """
 WebSocket handler for real-time audio streaming and transcription.
-Uses SimulWhisper for low-latency streaming on Apple Silicon.
+Uses SimulWhisper for low-latency streaming on Apple Silicon by default;
+any registered ASR backend can be selected with ASR_ENGINE.
 """
 
+import asyncio
 import json
 import logging
+import os
+import time
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+import metrics
+from asr_backends import BackendBusy, create_asr_backend
+from audio_codecs import IngestDecoder
+from audio_gate import create_vad_gate
+from ingest import IngestQueue
+from llm_scheduler import llm_session, scheduler
 from llm_service import extract_point_stream
-from simul_whisper_service import whisper_service
+from outbound import OutboundSender
+from rolling_summary import create_summarizer
+from session_store import session_store
+from speculative import create_speculator
 
 logger = logging.getLogger(__name__)
 
@@ -31,80 +44,317 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+# ASR backend (ASR_ENGINE, default: SimulWhisper/fallback sessions); the model
+# loads with the first connection
+asr_backend = create_asr_backend(default="auto")
+
+# Backstop for the final-transcription flush after a pause (seconds)
+FLUSH_TIMEOUT = float(os.getenv("FLUSH_TIMEOUT", "3.0"))
+
+
+async def shutdown():
+    """Release the ASR backend; call from the mounting app's shutdown."""
+    await asr_backend.close()
+    if session_store:
+        session_store.close()
+
 
 async def websocket_endpoint(websocket: WebSocket):
     """
     WebSocket endpoint for audio streaming.
 
     Protocol:
+    - Query: ?session_id=... resumes the session of a dropped connection
     - Binary messages: Audio chunks (16kHz mono int16 PCM)
     - JSON messages:
+      - {"type": "config", "codec": "mulaw", "sample_rate": 8000, "framed": true}:
+        Negotiate compressed/framed audio (see audio_codecs)
       - {"type": "pause"}: End of speech, trigger point extraction
       - {"type": "reset"}: Clear buffers and start fresh
 
     Responses:
+    - {"type": "session", "session_id": "...", "resumed": true/false}
+    - {"type": "config_ack", "codec": "...", "sample_rate": ..., "framed": ...}
     - {"type": "transcript", "text": "...", "partial": true/false}
     - {"type": "point_chunk", "text": "..."}
     - {"type": "point_complete", "source": "...", "point": "..."}
+    - {"type": "slow_down", "active": true/false, "queued_seconds": ...}:
+      Ingest queue full / drained again (INGEST_POLICY=backpressure)
     """
     await manager.connect(websocket)
-    transcript_buffer = ""
-    whisper_service.reset()
 
     try:
-        while True:
-            data = await websocket.receive()
+        await asr_backend.start()
+        stream = await asr_backend.open(id(websocket))
+    except BackendBusy as e:
+        logger.warning(f"Rejecting connection: {e}")
+        manager.disconnect(websocket)
+        # 1013: Try Again Later
+        await websocket.close(code=1013, reason="Server busy")
+        return
+    except Exception as e:
+        # e.g. the model failed to load: close instead of leaving the socket open
+        logger.error(f"Failed to open a transcription stream: {e}")
+        manager.disconnect(websocket)
+        # 1011: Internal Error
+        await websocket.close(code=1011, reason="Transcription unavailable")
+        return
 
-            if "bytes" in data:
-                # Audio chunk received - process immediately (streaming)
-                text = await whisper_service.feed_audio_async(data["bytes"])
+    # Metrics label, e.g. SimulWhisperService or WhisperFallbackService
+    backend = stream.backend
+    metrics.ACTIVE_SESSIONS.inc(backend=backend)
+    # LLM requests from this connection (and tasks it starts) share a fair slot
+    session_key = id(websocket)
+    llm_session.set(session_key)
+
+    sender = OutboundSender(websocket)
+    sender.start()
+    decoder = None
+    vad_gate = create_vad_gate()
+    speculator = create_speculator()
+    summarizer = create_summarizer()
+
+    # Resumable session: a reconnect continues the utterance in progress
+    client_session = None
+    if session_store:
+        client_session, resumed = session_store.open(
+            websocket.query_params.get("session_id")
+        )
+        await sender.send({
+            "type": "session",
+            "session_id": client_session.session_id,
+            "resumed": resumed,
+        })
+        if client_session.segments:
+            stream.restore(client_session.text)
+
+    # Arrival time of the oldest audio not yet returned as text
+    unconfirmed_since = None
+    # Real-time lag of this session, reported to the ASR governor if enabled
+    governor = getattr(asr_backend, "governor", None)
 
-                if text:
-                    transcript_buffer += " " + text
-                    await websocket.send_json({
+    async def send_transcriptions():
+        """Send the stream's confirmed text and partials as they arrive."""
+        nonlocal unconfirmed_since
+        try:
+            async for update in stream.results():
+                for text in update.committed:
+                    if unconfirmed_since is not None:
+                        metrics.CONFIRM_LAG_SECONDS.observe(
+                            time.perf_counter() - unconfirmed_since, backend=backend
+                        )
+                    unconfirmed_since = None
+                    if client_session:
+                        session_store.append(client_session, text)
+                    await sender.send({
                         "type": "transcript",
                         "text": text,
+                        "partial": not (stream.streaming or update.final),
+                    })
+                    if speculator:
+                        speculator.observe(len(text), stream.text)
+                    if summarizer:
+                        summarizer.observe(len(text), stream.text)
+
+                # Streaming fallback: also send the not-yet-confirmed hypothesis
+                if update.partial:
+                    await sender.send({
+                        "type": "transcript",
+                        "text": update.partial,
                         "partial": True,
                     })
+        except asyncio.CancelledError:
+            logger.info("Transcription sender cancelled")
+        except Exception as e:
+            logger.error(f"Error in transcription sender: {e}")
+
+    send_task = asyncio.create_task(send_transcriptions())
+
+    async def feed(audio: bytes):
+        """Transcribe queued audio; results go out through send_transcriptions."""
+        await stream.feed(audio)
+        if governor:
+            # Arrival to transcribed: queue wait plus inference. Dropped or
+            # coalesced audio shows up here as the age of what is left.
+            governor.observe_lag(time.perf_counter() - ingest.frame_received_at)
+
+    # Point generation of the last utterance; runs beside the receive loop so
+    # the next utterance can start and a reset or disconnect can cancel it
+    point_task = None
+
+    async def send_point(source, speculation, summaries, paused_at, previous):
+        """Stream the point for one utterance, after the previous one's."""
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            if speculation is not None:
+                # Started while the user was still speaking, on the raw transcript
+                prompt = speculation.source
+                point_stream = speculation.replay()
+            else:
+                # Long utterances: bounded prompt from rolling summaries
+                prompt = await summaries.condense(source) if summaries else source
+                point_stream = extract_point_stream(prompt)
+            point_text = ""
+            async for chunk in point_stream:
+                if not point_text:
+                    metrics.PAUSE_TO_FIRST_POINT_SECONDS.observe(
+                        time.perf_counter() - paused_at, backend=backend
+                    )
+                point_text += chunk
+                await sender.send({
+                    "type": "point_chunk",
+                    "text": chunk,
+                })
+
+            await sender.send({
+                "type": "point_complete",
+                "source": source,
+                "point": point_text,
+            })
+        except asyncio.CancelledError:
+            if previous is not None:
+                previous.cancel()
+            logger.info("Point generation cancelled")
+        except Exception as e:
+            logger.error(f"Error in point generation: {e}")
+        finally:
+            if speculation is not None:
+                speculation.cancel()
+            if summaries is not None:
+                summaries.cancel()
+
+    def cancel_points():
+        """Stop point generation in flight (reset or disconnect)."""
+        if point_task is not None:
+            point_task.cancel()
+        scheduler.cancel_session(session_key)
+        if speculator:
+            speculator.cancel()
+
+    async def next_utterance():
+        """Continue on a fresh ASR stream (e.g. a reset session)."""
+        nonlocal stream, send_task, unconfirmed_since
+        send_task.cancel()
+        try:
+            await send_task
+        except asyncio.CancelledError:
+            pass
+
+        if client_session:
+            session_store.clear(client_session)
+        if summarizer:
+            summarizer.reset()
+        unconfirmed_since = None
+        if vad_gate:
+            vad_gate.reset()
+        stream = await asr_backend.renew(stream)
+        send_task = asyncio.create_task(send_transcriptions())
+
+    # Bounded queue between the receive loop and transcription: frames that
+    # arrive while a chunk is being transcribed are coalesced or dropped
+    # instead of piling up in the socket
+    ingest = IngestQueue(feed, backend=backend, notify=sender.send)
+    ingest.start()
+
+    try:
+        while True:
+            data = await websocket.receive()
+            if data["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(data.get("code", 1000))
+
+            if "bytes" in data:
+                # Audio chunk received - queue for transcription (streaming)
+                received_at = time.perf_counter()
+                audio = data["bytes"]
+                if decoder:
+                    audio = await decoder.decode_async(audio)
+                if vad_gate:
+                    audio = vad_gate.process(audio)
+                # Inference time is covered by the ASR real-time factor
+                metrics.FRAME_INGEST_SECONDS.observe(
+                    time.perf_counter() - received_at, backend=backend
+                )
+                if not audio:
+                    continue
+                if unconfirmed_since is None:
+                    unconfirmed_since = received_at
+                await ingest.put(audio, received_at)
 
             elif "text" in data:
                 msg = json.loads(data["text"])
 
-                if msg.get("type") == "pause":
-                    # End of speech - finalize transcription
-                    final_text = await whisper_service.finish_async()
-                    if final_text:
-                        transcript_buffer += " " + final_text
-                        await websocket.send_json({
-                            "type": "transcript",
-                            "text": final_text,
-                            "partial": False,
-                        })
+                if msg.get("type") == "config":
+                    # Negotiate a compact ingestion format for binary frames
+                    try:
+                        decoder = IngestDecoder.from_config(msg)
+                    except ValueError as e:
+                        await sender.send({"type": "error", "message": str(e)})
+                        continue
+                    await sender.send({
+                        "type": "config_ack",
+                        "codec": decoder.codec if decoder else "pcm16",
+                        "sample_rate": decoder.sample_rate if decoder else 16000,
+                        "framed": decoder.framed if decoder else False,
+                    })
+
+                elif msg.get("type") == "pause":
+                    paused_at = time.perf_counter()
+                    # End of speech - transcribe queued audio, then finalize
+                    await ingest.drain()
+                    await stream.end()
+                    # Wait until every update up to the final one has been sent
+                    try:
+                        await asyncio.wait_for(
+                            asyncio.shield(send_task), timeout=FLUSH_TIMEOUT
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning(
+                            f"Final transcription not flushed within "
+                            f"{FLUSH_TIMEOUT}s, extracting point anyway"
+                        )
 
                     # Extract point from accumulated transcript
-                    if transcript_buffer.strip():
-                        point_text = ""
-                        async for chunk in extract_point_stream(transcript_buffer):
-                            point_text += chunk
-                            await websocket.send_json({
-                                "type": "point_chunk",
-                                "text": chunk,
-                            })
-
-                        await websocket.send_json({
-                            "type": "point_complete",
-                            "source": transcript_buffer.strip(),
-                            "point": point_text,
-                        })
-                        transcript_buffer = ""
+                    source = stream.text()
+                    if source:
+                        # Claimed now, before the next utterance can start its own
+                        speculation = speculator.take(source) if speculator else None
+                        summaries = summarizer.take() if summarizer else None
+                        point_task = asyncio.create_task(
+                            send_point(
+                                source, speculation, summaries, paused_at, point_task
+                            )
+                        )
 
                     # Reset for next utterance
-                    whisper_service.reset()
+                    await next_utterance()
 
                 elif msg.get("type") == "reset":
                     # Full reset
-                    transcript_buffer = ""
-                    whisper_service.reset()
+                    await ingest.clear()
+                    cancel_points()
+                    await next_utterance()
 
     except WebSocketDisconnect:
+        logger.info("WebSocket disconnected")
+    finally:
+        cancel_points()
+        await ingest.close()
+        logger.info(f"Ingest queue stats: {ingest.stats()}")
+        send_task.cancel()
+        try:
+            await send_task
+        except asyncio.CancelledError:
+            pass
+        if summarizer:
+            summarizer.reset()
+        await sender.close()
+        if decoder:
+            logger.info(f"Ingest decoder stats: {decoder.stats()}")
+        if vad_gate:
+            logger.info(f"VAD gate stats: {vad_gate.stats()}")
+        if client_session:
+            session_store.detach(client_session)
         manager.disconnect(websocket)
+        asr_backend.release(stream)
+        metrics.ACTIVE_SESSIONS.dec(backend=backend)
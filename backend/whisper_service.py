@@ -1,23 +1,56 @@
 import asyncio
 import os
+import threading
+from typing import Optional, Union
 
 import numpy as np
+import torch
 import whisper
 
+# 배치 디코딩 시 무음 판정 기준 (transcribe 기본값과 동일)
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+AudioInput = Union[bytes, np.ndarray]
+
+
+def to_float32(audio_data: AudioInput) -> np.ndarray:
+    """int16 PCM 바이트는 float32로 변환, float32 배열(뷰)은 복사 없이 그대로 사용"""
+    if isinstance(audio_data, np.ndarray):
+        return audio_data
+    return np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
+
 
 class WhisperService:
-    def __init__(self):
-        model_size = os.getenv("WHISPER_MODEL", "turbo")
-        self.model = whisper.load_model(model_size)
+    def __init__(self, model_size: Optional[str] = None):
+        self.model_size = model_size or os.getenv("WHISPER_MODEL", "turbo")
+        self._model = None
+        self._load_lock = threading.Lock()
 
-    def transcribe(self, audio_data: bytes) -> str:
-        """16kHz mono PCM 바이트를 텍스트로 변환"""
-        if not audio_data:
+    @property
+    def model(self):
+        """첫 사용 시 모델 로드 (import/생성 시점에는 로드하지 않음)"""
+        if self._model is None:
+            self.load()
+        return self._model
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        """모델 로드 (블로킹 - 이벤트 루프 밖에서 호출)"""
+        with self._load_lock:
+            if self._model is None:
+                self._model = whisper.load_model(self.model_size)
+        return self._model
+
+    def transcribe(self, audio_data: AudioInput) -> str:
+        """16kHz mono PCM 바이트(또는 float32 배열)를 텍스트로 변환"""
+        if len(audio_data) == 0:
             return ""
 
-        audio_np = (
-            np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
-        )
+        audio_np = to_float32(audio_data)
 
         result = self.model.transcribe(
             audio_np,
@@ -25,15 +58,85 @@ class WhisperService:
             task="transcribe",
             fp16=False,
             condition_on_previous_text=False,
-            no_speech_threshold=0.6,
+            no_speech_threshold=NO_SPEECH_THRESHOLD,
         )
 
         text = result.get("text", "")
         return text.strip()
 
-    async def transcribe_async(self, audio_data: bytes) -> str:
-        """비동기 전사"""
-        return await asyncio.to_thread(self.transcribe, audio_data)
+    def transcribe_words(
+        self, audio_data: AudioInput, prompt: Optional[str] = None
+    ) -> list[tuple[float, float, str]]:
+        """단어 단위 타임스탬프와 함께 전사 (초 단위, 입력 오디오 시작 기준)"""
+        if len(audio_data) == 0:
+            return []
 
+        audio_np = to_float32(audio_data)
 
-whisper_service = WhisperService()
+        result = self.model.transcribe(
+            audio_np,
+            language="ko",
+            task="transcribe",
+            fp16=False,
+            condition_on_previous_text=False,
+            no_speech_threshold=NO_SPEECH_THRESHOLD,
+            word_timestamps=True,
+            initial_prompt=prompt,
+        )
+
+        words = []
+        for segment in result.get("segments", []):
+            for word in segment.get("words", []):
+                text = word["word"].strip()
+                if text:
+                    words.append((word["start"], word["end"], text))
+        return words
+
+    def transcribe_batch(self, audio_batch: list[AudioInput]) -> list[str]:
+        """여러 세션의 30초 이하 오디오 창을 한 번의 디코딩으로 전사"""
+        if not audio_batch:
+            return []
+
+        audio_batch = [to_float32(audio) for audio in audio_batch]
+
+        # 30초를 넘는 창은 단일 mel 세그먼트로 디코딩할 수 없으므로 개별 처리
+        if any(len(audio) > whisper.audio.N_SAMPLES for audio in audio_batch):
+            return [self.transcribe(audio) for audio in audio_batch]
+
+        indices = [i for i, audio in enumerate(audio_batch) if len(audio)]
+        texts = [""] * len(audio_batch)
+        if not indices:
+            return texts
+
+        mels = []
+        for i in indices:
+            mels.append(
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(audio_batch[i]), n_mels=self.model.dims.n_mels
+                )
+            )
+        mel_batch = torch.stack(mels).to(self.model.device)
+
+        results = whisper.decode(
+            self.model,
+            mel_batch,
+            whisper.DecodingOptions(
+                language="ko",
+                task="transcribe",
+                fp16=False,
+                without_timestamps=True,
+            ),
+        )
+
+        for i, result in zip(indices, results):
+            if (
+                result.no_speech_prob > NO_SPEECH_THRESHOLD
+                and result.avg_logprob < LOGPROB_THRESHOLD
+            ):
+                continue
+            texts[i] = result.text.strip()
+        return texts
+
+    async def transcribe_async(self, audio_data: AudioInput) -> str:
+        """비동기 전사"""
+        return await asyncio.to_thread(self.transcribe, audio_data)
@@ -17,12 +17,17 @@ export function useWebSocket({
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<number | undefined>(undefined);
   const shouldReconnectRef = useRef(true);
+  // 서버가 발급한 세션 ID: 재연결 시 넘겨서 진행 중이던 발화를 이어감
+  const sessionIdRef = useRef<string | null>(null);
 
   const connect = useCallback(() => {
     shouldReconnectRef.current = true;
     if (wsRef.current?.readyState === WebSocket.OPEN) return;
 
-    const ws = new WebSocket(url);
+    const sessionUrl = sessionIdRef.current
+      ? `${url}${url.includes('?') ? '&' : '?'}session_id=${sessionIdRef.current}`
+      : url;
+    const ws = new WebSocket(sessionUrl);
 
     ws.onopen = () => {
       console.log('WebSocket 연결됨');
@@ -32,6 +37,12 @@ export function useWebSocket({
       const msg: WebSocketMessage = JSON.parse(event.data);
 
       switch (msg.type) {
+        case 'session':
+          if (msg.session_id) {
+            sessionIdRef.current = msg.session_id;
+            if (msg.resumed) console.log('세션 재개:', msg.session_id);
+          }
+          break;
         case 'transcript':
           if (msg.text) onTranscript(msg.text);
           break;
@@ -62,6 +73,8 @@ export function useWebSocket({
 
   const disconnect = useCallback(() => {
     shouldReconnectRef.current = false;
+    // 의도적인 종료는 세션을 이어가지 않음
+    sessionIdRef.current = null;
     clearTimeout(reconnectTimeoutRef.current);
     wsRef.current?.close();
     wsRef.current = null;
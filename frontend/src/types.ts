@@ -14,8 +14,10 @@ export interface Session {
 }
 
 export interface WebSocketMessage {
-  type: 'transcript' | 'point_chunk' | 'point_complete' | 'pause' | 'reset';
+  type: 'session' | 'transcript' | 'point_chunk' | 'point_complete' | 'pause' | 'reset';
   text?: string;
   source?: string;
   point?: string;
+  session_id?: string;
+  resumed?: boolean;
 }